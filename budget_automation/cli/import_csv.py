@@ -7,14 +7,16 @@ Imports transactions from Chase CSV files.
 import argparse
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
 from budget_automation.utils.db_connection import get_db_connection
 from budget_automation.core.csv_parser import parse_chase_csv
 from budget_automation.core.import_service import (
-    categorize_parsed,
+    build_orchestrator,
     insert_transactions,
+    iter_categorized,
 )
 
 
@@ -31,6 +33,8 @@ def main():
     parser.add_argument('--account-id', type=int, help='Account ID')
     parser.add_argument('--llm', action='store_true', help='Enable LLM categorization (uses API credits)')
     parser.add_argument('--dry-run', action='store_true', help='Parse and categorize but do not insert')
+    parser.add_argument('--bulk', action='store_true',
+                       help='Load via COPY (faster for large back-fills; a bad row fails its whole chunk)')
     
     args = parser.parse_args()
     
@@ -68,13 +72,49 @@ def main():
         enable_llm = args.llm if hasattr(args, 'llm') else enable_llm_default
 
         # Categorize via the shared import service (rules -> LLM -> needs-review).
-        # Taxonomy + rules are loaded from the DB inside the service.
+        # Taxonomy + rules are loaded from the DB once; rows are then categorized
+        # and inserted a chunk at a time so only one chunk of dicts is in memory.
+        # Inserts run on a single writer thread, so chunk N is written while
+        # chunk N+1 is categorized (LLM calls and DB writes are both I/O-bound).
+        # At most one insert is in flight, which bounds memory to two chunks.
         print(f"\n🏷️  Categorizing {len(parsed_txns)} transactions...")
-        txn_dicts, stats = categorize_parsed(conn, parsed_txns, enable_llm=enable_llm)
+        orchestrator = build_orchestrator(conn, enable_llm=enable_llm)
+
+        if args.dry_run:
+            print(f"\n🔍 DRY RUN - Not inserting into database")
+
+        sample = []
+        needs_review = []
+        needs_review_count = 0
+        totals = [0, 0, 0]  # inserted, duplicates, errors
+
+        def collect(pending):
+            for i, count in enumerate(pending.result()):
+                totals[i] += count
+
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending = None
+            for chunk in iter_categorized(orchestrator, parsed_txns):
+                if len(sample) < 10:
+                    sample.extend(chunk[:10 - len(sample)])
+                for txn in chunk:
+                    if txn['needs_review']:
+                        needs_review_count += 1
+                        if len(needs_review) < 5:
+                            needs_review.append(txn)
+                if not args.dry_run:
+                    if pending is not None:
+                        collect(pending)
+                    pending = writer.submit(
+                        insert_transactions, conn, chunk, bulk=args.bulk
+                    )
+            if pending is not None:
+                collect(pending)
+        inserted, duplicates, errors = totals
 
         # Show sample
         print(f"\n📋 Sample Results (first 10):")
-        for i, txn in enumerate(txn_dicts[:10], 1):
+        for i, txn in enumerate(sample, 1):
             status = "✅" if not txn['needs_review'] else "⚠️ "
             merchant = txn['merchant_norm']
             if txn['merchant_detail']:
@@ -83,16 +123,11 @@ def main():
             conf = txn['category_confidence'] or 0.0
             print(f"       ${abs(float(txn['amount'])):>7.2f}  {txn['category_source']:<8}  {conf:.0%}")
 
-        if len(txn_dicts) > 10:
-            print(f"       ... and {len(txn_dicts) - 10} more")
-
-        # Insert or dry run
-        if args.dry_run:
-            print(f"\n🔍 DRY RUN - Not inserting into database")
-        else:
-            print(f"\n💾 Inserting into database...")
-            inserted, duplicates, errors = insert_transactions(conn, txn_dicts)
+        if len(parsed_txns) > 10:
+            print(f"       ... and {len(parsed_txns) - 10} more")
 
+        if not args.dry_run:
+            print(f"\n💾 Inserted into database:")
             print(f"   ✅ Inserted: {inserted}")
             if duplicates > 0:
                 print(f"   ⏭️  Skipped (duplicates): {duplicates}")
@@ -100,16 +135,15 @@ def main():
                 print(f"   ❌ Errors: {errors}")
 
         # Review queue summary
-        needs_review = [t for t in txn_dicts if t['needs_review']]
-        if needs_review:
-            print(f"\n⚠️  {len(needs_review)} transactions need review:")
-            for txn in needs_review[:5]:
+        if needs_review_count:
+            print(f"\n⚠️  {needs_review_count} transactions need review:")
+            for txn in needs_review:
                 merchant = txn['merchant_norm']
                 if txn['merchant_detail']:
                     merchant += f" ({txn['merchant_detail']})"
                 print(f"   • {merchant:<50} ${abs(float(txn['amount'])):>7.2f}")
-            if len(needs_review) > 5:
-                print(f"   ... and {len(needs_review) - 5} more")
+            if needs_review_count > 5:
+                print(f"   ... and {needs_review_count - 5} more")
         else:
             print(f"\n✅ All transactions categorized with high confidence!")
 
@@ -8,6 +8,8 @@ import json
 import sys
 from pathlib import Path
 
+from psycopg2.extras import execute_values
+
 from budget_automation.utils.db_connection import get_db_connection
 
 
@@ -45,26 +47,31 @@ def load_taxonomy(conn, taxonomy_file: Path):
         # Clear existing taxonomy
         cursor.execute("DELETE FROM taxonomy_categories")
         
-        # Insert categories and subcategories
-        for cat in taxonomy['categories']:
-            cursor.execute("""
-                INSERT INTO taxonomy_categories (category, display_order, is_income, is_transfer)
-                VALUES (%s, %s, %s, %s)
-            """, (cat['name'], cat['display_order'], cat['is_income'], cat['is_transfer']))
-            
-            for subcat in cat['subcategories']:
-                cursor.execute("""
-                    INSERT INTO taxonomy_subcategories (category, subcategory)
-                    VALUES (%s, %s)
-                """, (cat['name'], subcat))
+        # Insert categories and subcategories (one multi-row INSERT each)
+        categories = [
+            (cat['name'], cat['display_order'], cat['is_income'], cat['is_transfer'])
+            for cat in taxonomy['categories']
+        ]
+        subcategories = [
+            (cat['name'], subcat)
+            for cat in taxonomy['categories']
+            for subcat in cat['subcategories']
+        ]
+        
+        execute_values(cursor, """
+            INSERT INTO taxonomy_categories (category, display_order, is_income, is_transfer)
+            VALUES %s
+        """, categories)
+        execute_values(cursor, """
+            INSERT INTO taxonomy_subcategories (category, subcategory)
+            VALUES %s
+        """, subcategories)
         
         conn.commit()
         
         # Print summary
-        cursor.execute("SELECT COUNT(*) FROM taxonomy_categories")
-        cat_count = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM taxonomy_subcategories")
-        subcat_count = cursor.fetchone()[0]
+        cat_count = len(categories)
+        subcat_count = len(subcategories)
         
         print(f"   ✅ Loaded {cat_count} categories, {subcat_count} subcategories")
         
@@ -113,34 +120,45 @@ def print_summary(conn):
     """Print database summary"""
     cursor = conn.cursor()
     
+    # All counts in one round trip; rule counts come back one row per pack,
+    # with COUNT(match_detail) (non-NULL only) giving the composite rules.
+    cursor.execute("""
+        SELECT 'categories', NULL, COUNT(*), 0 FROM taxonomy_categories
+        UNION ALL
+        SELECT 'subcategories', NULL, COUNT(*), 0 FROM taxonomy_subcategories
+        UNION ALL
+        SELECT 'accounts', NULL, COUNT(*), 0 FROM accounts
+        UNION ALL
+        SELECT 'transactions', NULL, COUNT(*), 0 FROM transactions
+        UNION ALL
+        SELECT 'rules', rule_pack, COUNT(*), COUNT(match_detail)
+        FROM merchant_rules GROUP BY rule_pack
+    """)
+    
+    counts = {}
+    rule_packs = []
+    for kind, pack, count, composite_count in cursor.fetchall():
+        if kind == 'rules':
+            rule_packs.append((pack, count, composite_count))
+        else:
+            counts[kind] = count
+    rule_packs.sort()
+    
     print("\n" + "=" * 80)
     print("📊 DATABASE SUMMARY")
     print("=" * 80)
     
-    cursor.execute("SELECT COUNT(*) FROM taxonomy_categories")
-    print(f"Categories: {cursor.fetchone()[0]}")
-    
-    cursor.execute("SELECT COUNT(*) FROM taxonomy_subcategories")
-    print(f"Subcategories: {cursor.fetchone()[0]}")
-    
-    cursor.execute("SELECT COUNT(*) FROM accounts")
-    print(f"Accounts: {cursor.fetchone()[0]}")
+    print(f"Categories: {counts['categories']}")
+    print(f"Subcategories: {counts['subcategories']}")
+    print(f"Accounts: {counts['accounts']}")
     
-    cursor.execute("SELECT rule_pack, COUNT(*) FROM merchant_rules GROUP BY rule_pack ORDER BY rule_pack")
     print(f"\nMerchant Rules:")
-    for pack, count in cursor.fetchall():
-        cursor.execute("""
-            SELECT COUNT(*) FROM merchant_rules 
-            WHERE rule_pack = %s AND match_detail IS NOT NULL
-        """, (pack,))
-        composite_count = cursor.fetchone()[0]
+    for pack, count, composite_count in rule_packs:
         print(f"  • {pack}: {count} rules ({composite_count} composite)")
     
-    cursor.execute("SELECT COUNT(*) FROM merchant_rules")
-    print(f"  Total: {cursor.fetchone()[0]} rules")
+    print(f"  Total: {sum(count for _, count, _ in rule_packs)} rules")
     
-    cursor.execute("SELECT COUNT(*) FROM transactions")
-    print(f"\nTransactions: {cursor.fetchone()[0]}")
+    print(f"\nTransactions: {counts['transactions']}")
     
     print("=" * 80)
     
@@ -9,31 +9,29 @@ import json
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-from budget_automation.utils.db_connection import get_db_connection
+try:
+    import termios
+    import tty
+except ImportError:  # Windows: no termios, fall back to line input
+    termios = None
+
+from psycopg2.extras import execute_values
+
+from budget_automation.core.taxonomy_db import load_taxonomy_from_db
+from budget_automation.utils.db_connection import ensure_prepared, get_db_connection
 
 
 def load_taxonomy(conn) -> Dict:
-    """Load taxonomy from database"""
-    cursor = conn.cursor()
-    
-    # Get all categories with their subcategories
-    cursor.execute("""
-        SELECT c.category, c.display_order, 
-               ARRAY_AGG(s.subcategory ORDER BY s.subcategory) as subcategories
-        FROM taxonomy_categories c
-        LEFT JOIN taxonomy_subcategories s ON c.category = s.category
-        GROUP BY c.category, c.display_order
-        ORDER BY c.display_order
-    """)
-    
-    taxonomy = {}
-    for row in cursor.fetchall():
-        category = row[0]
-        subcategories = row[2] if row[2] else []
-        taxonomy[category] = subcategories
-    
-    cursor.close()
-    return taxonomy
+    """Load taxonomy from database as {category: [subcategories]}.
+
+    Uses the shared two-query loader (flat fetch + Python grouping) rather than
+    a LEFT JOIN / ARRAY_AGG, which also keeps categories with no subcategories
+    as an empty list instead of [None].
+    """
+    return {
+        cat['name']: cat['subcategories']
+        for cat in load_taxonomy_from_db(conn)['categories']
+    }
 
 
 def get_transactions_needing_review(conn, limit: int = None) -> List[Dict]:
@@ -71,6 +69,15 @@ def get_transactions_needing_review(conn, limit: int = None) -> List[Dict]:
     return transactions
 
 
+def count_needing_review(conn) -> int:
+    """Count transactions that still need review"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM transactions WHERE needs_review = TRUE")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
 def display_transaction(txn: Dict, index: int, total: int):
     """Display transaction details"""
     print("\n" + "=" * 80)
@@ -88,29 +95,69 @@ def display_transaction(txn: Dict, index: int, total: int):
     print(f"Current:      {txn['category']} / {txn['subcategory']}")
 
 
-def display_categories(taxonomy: Dict):
-    """Display available categories"""
-    print("\n📂 Available Categories:")
+# Single-key labels for menu entries, in display order. 's' (skip) and 'q'
+# (quit) are reserved, so they never label an entry.
+CHOICE_KEYS = "123456789abcdefghijklmnoprtuvwxyz"
+
+
+def read_key(prompt: str) -> str:
+    """
+    Read one keypress (no Enter needed) when stdin is a terminal; otherwise
+    fall back to a line of input. Returns the lowercased key.
+    """
+    print(prompt, end='', flush=True)
+    if termios is None or not sys.stdin.isatty():
+        return input().strip().lower()
+    
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        key = sys.stdin.read(1)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+    print(key)
+    return key.lower()
+
+
+def display_choices(title: str, options: List[str]):
+    """Display a menu of options, each labelled with its key"""
+    print(f"\n{title}")
     print("-" * 80)
     
-    for i, category in enumerate(taxonomy.keys(), 1):
-        print(f"{i:2d}. {category}")
+    keyed = len(options) <= len(CHOICE_KEYS)
+    for i, option in enumerate(options):
+        label = CHOICE_KEYS[i] if keyed else f"{i + 1:2d}"
+        print(f"{label:>2}. {option}")
+
+
+def display_categories(taxonomy: Dict):
+    """Display available categories"""
+    display_choices("📂 Available Categories:", list(taxonomy.keys()))
 
 
 def display_subcategories(category: str, subcategories: List[str]):
     """Display subcategories for a category"""
-    print(f"\n📁 Subcategories for '{category}':")
-    print("-" * 80)
-    
-    for i, subcat in enumerate(subcategories, 1):
-        print(f"{i:2d}. {subcat}")
+    display_choices(f"📁 Subcategories for '{category}':", subcategories)
 
 
 def get_user_choice(prompt: str, max_value: int, allow_skip: bool = True) -> int:
-    """Get user's numeric choice"""
+    """
+    Get user's choice as a 1-based index (-1 = skip, -2 = quit).
+    
+    Menus that fit in CHOICE_KEYS take a single keypress; longer ones fall
+    back to typing the number.
+    """
+    keyed = 0 < max_value <= len(CHOICE_KEYS)
+    key_index = {key: i for i, key in enumerate(CHOICE_KEYS[:max_value], 1)}
+    skip_text = " (or 's' to skip)" if allow_skip else ""
+    
     while True:
-        skip_text = " (or 's' to skip)" if allow_skip else ""
-        user_input = input(f"\n{prompt} (1-{max_value}){skip_text}: ").strip().lower()
+        if keyed:
+            last_key = CHOICE_KEYS[max_value - 1]
+            user_input = read_key(f"\n{prompt} (1-{last_key}){skip_text}: ")
+        else:
+            user_input = input(f"\n{prompt} (1-{max_value}){skip_text}: ").strip().lower()
         
         if allow_skip and user_input == 's':
             return -1
@@ -118,6 +165,12 @@ def get_user_choice(prompt: str, max_value: int, allow_skip: bool = True) -> int
         if user_input == 'q':
             return -2
         
+        if keyed:
+            if user_input in key_index:
+                return key_index[user_input]
+            print(f"❌ Press one of the listed keys")
+            continue
+        
         try:
             choice = int(user_input)
             if 1 <= choice <= max_value:
@@ -128,40 +181,75 @@ def get_user_choice(prompt: str, max_value: int, allow_skip: bool = True) -> int
             print(f"❌ Invalid input. Please enter a number.")
 
 
-def update_transaction(conn, txn_id: int, category: str, subcategory: str):
-    """Update transaction category"""
+def prepare_statements(conn):
+    """
+    PREPARE the rule-creation statements once for this session, so each rule
+    only sends EXECUTE + parameters instead of re-parsing and re-planning the
+    SQL. Must be called once after connecting; a pooled session that already
+    has them keeps its existing ones.
+    """
     cursor = conn.cursor()
+    ensure_prepared(cursor, 'review_find_rule', """
+        PREPARE review_find_rule (text, text) AS
+        SELECT rule_id FROM merchant_rules
+        WHERE match_value = $1 AND match_detail IS NOT DISTINCT FROM $2
+    """)
+    ensure_prepared(cursor, 'review_insert_rule', """
+        PREPARE review_insert_rule (text, text, text, text) AS
+        INSERT INTO merchant_rules (
+            rule_pack, priority, match_type, match_value, match_detail,
+            category, subcategory, is_active, notes
+        ) VALUES (
+            'manual', 10, 'exact', $1, $2,
+            $3, $4, TRUE, 'Created via review tool'
+        )
+    """)
+    conn.commit()
+    cursor.close()
+
+
+# Review decisions are queued and written in one statement every this many.
+FLUSH_EVERY = 10
+
+
+def flush_updates(conn, pending: List[Tuple[int, str, str]]):
+    """
+    Write queued review decisions, (txn_id, category, subcategory) tuples, in
+    a single UPDATE ... FROM (VALUES ...) and commit once. Clears `pending`.
+    """
+    if not pending:
+        return
     
-    cursor.execute("""
-        UPDATE transactions
-        SET category = %s,
-            subcategory = %s,
+    cursor = conn.cursor()
+    execute_values(cursor, """
+        UPDATE transactions t
+        SET category = v.category,
+            subcategory = v.subcategory,
             needs_review = FALSE,
             category_source = 'manual',
             category_confidence = 1.0
-        WHERE txn_id = %s
-    """, (category, subcategory, txn_id))
+        FROM (VALUES %s) AS v(txn_id, category, subcategory)
+        WHERE t.txn_id = v.txn_id
+    """, pending)
     
     conn.commit()
     cursor.close()
+    print(f"   💾 Saved {len(pending)} decision(s)")
+    pending.clear()
 
 
 def create_rule(conn, merchant_norm: str, merchant_detail: str, 
                 category: str, subcategory: str, composite: bool = False):
-    """Create a categorization rule"""
+    """Create a categorization rule (requires prepare_statements)"""
     cursor = conn.cursor()
     
+    # Composite rules match on merchant + detail; simple rules have no detail.
+    match_detail = merchant_detail if composite and merchant_detail else None
+    
     # Check if rule already exists
-    if composite and merchant_detail:
-        cursor.execute("""
-            SELECT rule_id FROM merchant_rules
-            WHERE match_value = %s AND match_detail = %s
-        """, (merchant_norm, merchant_detail))
-    else:
-        cursor.execute("""
-            SELECT rule_id FROM merchant_rules
-            WHERE match_value = %s AND match_detail IS NULL
-        """, (merchant_norm,))
+    cursor.execute(
+        "EXECUTE review_find_rule (%s, %s)", (merchant_norm, match_detail)
+    )
     
     if cursor.fetchone():
         print(f"   ℹ️  Rule already exists for this merchant")
@@ -169,27 +257,13 @@ def create_rule(conn, merchant_norm: str, merchant_detail: str,
         return
     
     # Create new rule
-    if composite and merchant_detail:
-        cursor.execute("""
-            INSERT INTO merchant_rules (
-                rule_pack, priority, match_type, match_value, match_detail,
-                category, subcategory, is_active, notes
-            ) VALUES (
-                'manual', 10, 'exact', %s, %s,
-                %s, %s, TRUE, 'Created via review tool'
-            )
-        """, (merchant_norm, merchant_detail, category, subcategory))
+    cursor.execute(
+        "EXECUTE review_insert_rule (%s, %s, %s, %s)",
+        (merchant_norm, match_detail, category, subcategory),
+    )
+    if match_detail:
         print(f"   ✅ Created composite rule: {merchant_norm} + {merchant_detail}")
     else:
-        cursor.execute("""
-            INSERT INTO merchant_rules (
-                rule_pack, priority, match_type, match_value,
-                category, subcategory, is_active, notes
-            ) VALUES (
-                'manual', 10, 'exact', %s,
-                %s, %s, TRUE, 'Created via review tool'
-            )
-        """, (merchant_norm, category, subcategory))
         print(f"   ✅ Created rule: {merchant_norm}")
     
     conn.commit()
@@ -210,7 +284,14 @@ def main():
         print(f"❌ Database connection failed: {e}")
         sys.exit(1)
     
+    # Decisions not yet written; flushed every FLUSH_EVERY, at the end, and
+    # on Ctrl-C. After an error they are dropped: the connection may be the
+    # thing that failed, and a second failure would hide the first.
+    pending: List[Tuple[int, str, str]] = []
+    
     try:
+        prepare_statements(conn)
+        
         # Load taxonomy
         print("📚 Loading taxonomy...")
         taxonomy = load_taxonomy(conn)
@@ -239,7 +320,7 @@ def main():
             print("   2. Skip to next")
             print("   3. Quit (save and exit)")
             
-            action = input("\nChoose action (1-3): ").strip()
+            action = read_key("\nChoose action (1-3): ")
             
             if action == '3' or action.lower() == 'q':
                 print(f"\n✅ Reviewed {reviewed} transactions, skipped {skipped}")
@@ -287,19 +368,20 @@ def main():
             # Ask if should create rule
             print(f"\n💡 Categorize '{txn['merchant_norm']}' as {category} / {subcategory}")
             
-            create_rule_choice = input("Create rule for future transactions? (y/n): ").strip().lower()
+            create_rule_choice = read_key("Create rule for future transactions? (y/n): ")
             
             # If merchant has detail (Square, Zelle, etc.), ask if composite rule
             composite = False
             if create_rule_choice == 'y' and txn['merchant_detail']:
                 print(f"\n   Merchant detail found: {txn['merchant_detail']}")
-                composite_choice = input(f"   Create rule for '{txn['merchant_norm']}' only or '{txn['merchant_norm']} + {txn['merchant_detail']}'? (simple/composite): ").strip().lower()
+                composite_choice = read_key(f"   Create rule for '{txn['merchant_norm']}' only or '{txn['merchant_norm']} + {txn['merchant_detail']}'? (s)imple/(c)omposite: ")
                 composite = composite_choice == 'composite' or composite_choice == 'c'
             
-            # Update transaction
-            print("\n💾 Saving...")
-            update_transaction(conn, txn['txn_id'], category, subcategory)
-            print(f"   ✅ Updated transaction")
+            # Queue the update; decisions are written in batches
+            pending.append((txn['txn_id'], category, subcategory))
+            print(f"   ✅ Queued")
+            if len(pending) >= FLUSH_EVERY:
+                flush_updates(conn, pending)
             
             # Create rule if requested
             if create_rule_choice == 'y':
@@ -308,6 +390,8 @@ def main():
             
             reviewed += 1
         
+        flush_updates(conn, pending)
+        
         # Summary
         print("\n" + "=" * 80)
         print("📊 REVIEW SUMMARY")
@@ -316,16 +400,22 @@ def main():
         print(f"⏭️  Skipped: {skipped}")
         
         # Check remaining
-        remaining = get_transactions_needing_review(conn)
+        remaining = count_needing_review(conn)
         if remaining:
-            print(f"⚠️  Still need review: {len(remaining)}")
+            print(f"⚠️  Still need review: {remaining}")
         else:
             print(f"🎉 All transactions categorized!")
         
         print("=" * 80)
         
+    except KeyboardInterrupt:
+        conn.rollback()
+        flush_updates(conn, pending)
+        raise
     except Exception as e:
         print(f"\n❌ Error: {e}")
+        if pending:
+            print(f"   ⚠️  {len(pending)} queued decision(s) not saved")
         import traceback
         traceback.print_exc()
         sys.exit(1)
@@ -5,79 +5,81 @@ Matches Amazon orders from staging table (amazon_orders_raw) to credit card
 transactions and expands them into detailed line items with LLM categorization.
 """
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime
 from decimal import Decimal
+import hashlib
 import json
+import re
 
-from budget_automation.utils.db_connection import get_db_connection
+from psycopg2.extras import execute_values, register_default_json
+
+from budget_automation.utils.db_connection import ensure_prepared, get_db_connection
 from budget_automation.core.llm_categorizer import LLMCategorizer
 from budget_automation.core.taxonomy_db import load_taxonomy_from_db
 
 
+UNENRICHED_FETCH_SIZE = 5000
+
+
+def _loads_decimal_json(s):
+    return json.loads(s, parse_float=Decimal)
+
+
 def get_unenriched_orders(conn, start_date='2023-01-01'):
     """
     Get orders from staging table that haven't been enriched yet
     
     Returns list of orders with all items grouped by order_id
     """
-    cursor = conn.cursor()
-    
-    # Get all unenriched order items
+    # Server-side cursor: rows stream in UNENRICHED_FETCH_SIZE batches rather
+    # than materializing the whole backlog client-side with fetchall().
+    cursor = conn.cursor(name='unenriched_orders')
+    cursor.itersize = UNENRICHED_FETCH_SIZE
+    # Item amounts arrive inside JSON; parse them as Decimal like NUMERIC columns
+    register_default_json(cursor, loads=_loads_decimal_json)
+
+    # One row per order, items aggregated server-side. NULL amounts and
+    # quantities are defaulted here, and the product name is truncated once
+    # to fit merchant_detail (64 chars).
     cursor.execute("""
         SELECT
             order_id,
-            order_date,
-            product_name,
-            asin,
-            quantity,
-            unit_price,
-            unit_price_tax,
-            shipping_charge,
-            total_owed,
-            total_discounts,
-            payment_instrument_type
+            MIN(order_date) AS order_date,
+            SUM(COALESCE(total_owed, 0.00)) AS total,
+            -- Amazon's own payment label for the order (any non-empty one
+            -- across its rows); used to label payment source accurately
+            MIN(NULLIF(btrim(payment_instrument_type), '')) AS payment_instrument,
+            json_agg(json_build_object(
+                'product_name', product_name,
+                'name_short', left(COALESCE(product_name, ''), 60),
+                'asin', asin,
+                'quantity', COALESCE(NULLIF(quantity, 0), 1),
+                'unit_price', COALESCE(unit_price, 0.00),
+                'unit_price_tax', COALESCE(unit_price_tax, 0.00),
+                'shipping_charge', COALESCE(shipping_charge, 0.00),
+                'total_owed', COALESCE(total_owed, 0.00),
+                'total_discounts', COALESCE(total_discounts, 0.00)
+            ) ORDER BY asin) AS items
         FROM amazon_orders_raw
         WHERE enriched = FALSE
           AND order_date >= %s
+        GROUP BY order_id
         ORDER BY order_date, order_id
     """, (start_date,))
 
-    rows = cursor.fetchall()
-    cursor.close()
-
-    # Group items by order_id
-    orders = {}
-    for row in rows:
-        order_id = row[0]
-
-        if order_id not in orders:
-            orders[order_id] = {
-                'order_id': order_id,
-                'order_date': row[1],
-                'items': [],
-                'total': Decimal('0.00'),
-                # Amazon's own payment label for the order (first non-empty
-                # across its rows); used to label payment source accurately.
-                'payment_instrument': None,
-            }
-
-        item = {
-            'product_name': row[2],
-            'asin': row[3],
-            'quantity': row[4] or 1,
-            'unit_price': Decimal(str(row[5])) if row[5] else Decimal('0.00'),
-            'unit_price_tax': Decimal(str(row[6])) if row[6] else Decimal('0.00'),
-            'shipping_charge': Decimal(str(row[7])) if row[7] else Decimal('0.00'),
-            'total_owed': Decimal(str(row[8])) if row[8] else Decimal('0.00'),
-            'total_discounts': Decimal(str(row[9])) if row[9] else Decimal('0.00')
+    orders = [
+        {
+            'order_id': order_id,
+            'order_date': order_date,
+            'items': items,
+            'total': total,
+            'payment_instrument': payment_instrument,
         }
+        for order_id, order_date, total, payment_instrument, items in cursor
+    ]
 
-        orders[order_id]['items'].append(item)
-        orders[order_id]['total'] += item['total_owed']
-        if not orders[order_id]['payment_instrument'] and (row[10] or '').strip():
-            orders[order_id]['payment_instrument'] = row[10].strip()
-
-    return list(orders.values())
+    cursor.close()
+    return orders
 
 
 def classify_payment_instrument(raw):
@@ -133,54 +135,103 @@ def build_payment_note(order, item, payment_source, payment_instrument, matched_
     return f"{base} | {pay}"
 
 
-def find_matching_transaction(conn, order_date, order_total, window_days=3):
+_MATCH_SQL = """
+    SELECT o.order_id, t.txn_id, t.txn_date, t.amount, t.merchant_raw, t.account_id
+    FROM (VALUES %s) AS o(order_id, order_date, total)
+    JOIN transactions t
+      ON t.merchant_norm = 'AMAZON'
+     AND t.txn_date BETWEEN o.order_date - make_interval(days => {window_days})
+                        AND o.order_date + make_interval(days => {window_days})
+     AND ABS(t.amount - o.total) < 0.02
+     AND (t.created_by = 'import' OR t.created_by IS NULL)
+    ORDER BY o.order_id,
+             ABS(EXTRACT(EPOCH FROM (t.txn_date - o.order_date))),
+             ABS(t.amount - o.total),
+             t.txn_id
+"""
+
+
+def find_matching_transactions(conn, orders, window_days=3):
     """
-    Find credit card transaction that matches this Amazon order
-    
-    Args:
-        order_date: Date of Amazon order
-        order_total: Total amount charged
-        window_days: Days before/after to search
-    
-    Returns transaction ID if found, None otherwise
+    Match many Amazon orders to credit card transactions in one query.
+
+    A candidate is an imported AMAZON transaction dated within window_days
+    of the order whose amount is within 2 cents of the order total; the
+    closest date, then the closest amount, wins. Orders are sent as a
+    VALUES list and joined server-side, and each charge goes to at most
+    one order.
+
+    Returns {order_id: match dict} for the orders that matched.
     """
+    if not orders:
+        return {}
+
     cursor = conn.cursor()
-    
-    # Search for AMAZON transactions within date window
-    start_date = order_date - timedelta(days=window_days)
-    end_date = order_date + timedelta(days=window_days)
-    
-    cursor.execute("""
-        SELECT txn_id, txn_date, amount, merchant_raw
-        FROM transactions
-        WHERE merchant_norm = 'AMAZON'
-          AND txn_date BETWEEN %s AND %s
-          AND ABS(amount - %s) < 0.02
-          AND (created_by = 'import' OR created_by IS NULL)
-        ORDER BY ABS(EXTRACT(EPOCH FROM (txn_date - %s))), ABS(amount - %s)
-        LIMIT 1
-    """, (start_date, end_date, float(order_total), order_date, float(order_total)))
-    
-    result = cursor.fetchone()
+    rows = execute_values(
+        cursor,
+        _MATCH_SQL.format(window_days=int(window_days)),
+        [(o['order_id'], o['order_date'], o['total']) for o in orders],
+        template="(%s, %s::timestamp, %s::numeric)",
+        page_size=1000,
+        fetch=True,
+    )
     cursor.close()
-    
-    if result:
-        return {
-            'txn_id': result[0],
-            'txn_date': result[1],
-            'amount': result[2],
-            'merchant_raw': result[3]
-        }
-    
-    return None
 
+    # Every candidate charge per order, best first
+    candidates = {}
+    for order_id, *txn in rows:
+        candidates.setdefault(order_id, []).append(txn)
+
+    # Each charge pays for one order: orders claim their best charge in the
+    # order given, skipping charges an earlier order already took, so two
+    # same-total orders in one window match two different charges.
+    matches = {}
+    claimed = set()
+    for order in orders:
+        for txn_id, txn_date, amount, merchant_raw, account_id in candidates.get(order['order_id'], ()):
+            if txn_id in claimed:
+                continue
+            claimed.add(txn_id)
+            matches[order['order_id']] = {
+                'txn_id': txn_id,
+                'txn_date': txn_date,
+                'amount': amount,
+                'merchant_raw': merchant_raw,
+                'account_id': account_id,
+            }
+            break
+    return matches
+
+
+# Runs of punctuation and whitespace together, so stripping and collapsing
+# is one pass (Unicode-aware, so "—", "™" etc. go too)
+_NON_WORD_RE = re.compile(r'\W+')
+
+
+def normalize_product_name(product_name):
+    """Cache key for a product name: lowercase, punctuation stripped,
+    whitespace collapsed, truncated to 80 chars."""
+    return _NON_WORD_RE.sub(' ', (product_name or '').lower()).strip()[:80]
 
-def categorize_product_with_llm(product_name, llm_categorizer):
+
+def categorize_product_with_llm(product_name, llm_categorizer, cache=None, asin=None):
     """
     Use LLM to categorize an Amazon product
-    
+
+    If a cache dict is passed, results are looked up (and stored) by ASIN
+    first, then by normalized product name, so repeat purchases of the same
+    product across orders only hit the LLM once per run. Cache hits are used
+    even without an LLM (e.g. categories persisted by an earlier run).
+
     Returns: (category, subcategory) tuple
     """
+    asin_key = ('asin', asin) if asin else None
+    name_key = ('name', normalize_product_name(product_name))
+    if cache is not None:
+        cached = (asin_key and cache.get(asin_key)) or cache.get(name_key)
+        if cached:
+            return cached
+
     if not llm_categorizer or not getattr(llm_categorizer, 'enabled', False):
         # Fallback to Shopping/Amazon if no LLM
         return ('Shopping', 'Amazon')
@@ -193,116 +244,253 @@ def categorize_product_with_llm(product_name, llm_categorizer):
             amount=0.0,  # Amount doesn't matter for product categorization
             direction='debit',
         )
-        if result:
-            return (result['category'], result['subcategory'])
-        return ('Shopping', 'Amazon')
-
     except Exception as e:
         print(f"⚠️  LLM categorization failed for '{product_name[:50]}': {e}")
+        result = None
+
+    if not result:
+        # Not cached, so a transient failure is retried for the next item
         return ('Shopping', 'Amazon')
 
+    categorized = (result['category'], result['subcategory'])
+    if cache is not None:
+        if asin_key:
+            cache[asin_key] = categorized
+        cache[name_key] = categorized
+    return categorized
+
 
-def expand_amazon_order(conn, order, matched_txn, payment_source, llm_categorizer=None,
-                        dry_run=False, payment_instrument=None):
+def load_product_category_cache(conn):
     """
-    Expand an Amazon order into detailed line items
+    Load persisted ASIN categorizations as a category cache dict.
 
-    Handles both:
-    - Matched orders (has CC transaction) - deletes CC txn, creates line items
-    - Unmatched orders (no CC transaction) - creates line items anyway
+    Pairs no longer in the taxonomy are dropped by the join. Returns an
+    empty dict if the table is missing (migration 004 not applied).
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT p.asin, p.category, p.subcategory
+            FROM product_category_cache p
+            JOIN taxonomy_subcategories s
+              ON s.category = p.category AND s.subcategory = p.subcategory
+        """)
+        rows = cursor.fetchall()
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️  Could not load product category cache: {e}")
+        return {}
+    finally:
+        cursor.close()
 
-    Args:
-        payment_source: 'credit_card' | 'gift_card' | 'unknown'
-        payment_instrument: Amazon's payment label (e.g. "Visa - 1234"), or None
+    return {('asin', asin): (category, subcategory) for asin, category, subcategory in rows}
+
+
+def save_product_category_cache(conn, orders, cache, known_keys=None):
+    """
+    Persist the ASIN categorizations in cache that aren't in known_keys (the
+    keys already in the table). Commits on its own; a failure is reported and
+    rolled back without failing the enrichment.
+
+    Written keys are added to known_keys, so calling this again later in the
+    run only writes what was categorized since.
+
+    Returns the number of rows written.
     """
+    if known_keys is None:
+        known_keys = set()
+    rows = {}
+    for order in orders:
+        for item in order['items']:
+            asin = item['asin']
+            key = ('asin', asin)
+            if asin and asin not in rows and key in cache and key not in known_keys:
+                category, subcategory = cache[key]
+                rows[asin] = (asin, item['product_name'], category, subcategory)
+
+    if not rows:
+        return 0
+
     cursor = conn.cursor()
+    try:
+        execute_values(cursor, """
+            INSERT INTO product_category_cache (asin, product_name, category, subcategory)
+            VALUES %s
+            ON CONFLICT (asin) DO NOTHING
+        """, list(rows.values()))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️  Could not save product category cache: {e}")
+        return 0
+    finally:
+        cursor.close()
 
-    if dry_run:
-        print(f"\n📦 {order['order_id']} | {order['order_date'].date()} | ${order['total']:.2f}")
+    known_keys.update(('asin', asin) for asin in rows)
+    return len(rows)
 
-        if matched_txn:
-            print(f"   Matched to: txn_id={matched_txn['txn_id']} | {matched_txn['txn_date']} | ${matched_txn['amount']:.2f}")
-        else:
-            print(f"   No CC match found")
-        print(f"   Payment: {payment_instrument or payment_source}")
 
-        print(f"   Would expand into {len(order['items'])} items:")
-        
+def precategorize_products(orders, llm_categorizer, cache, chunk_size=50):
+    """
+    Fill the category cache for every distinct product in orders (by ASIN,
+    then normalized name) with batched LLM requests (chunk_size products per
+    prompt) instead of one request per item. Products already cached are
+    skipped; any the batch fails on are left uncached and fall back to
+    categorize_product_with_llm later.
+    """
+    if not llm_categorizer or not getattr(llm_categorizer, 'enabled', False):
+        return
+
+    # Dedup pass: one entry per ASIN first (the same product bought in many
+    # orders, even if its listing title changed), then per normalized name.
+    # normalized name -> (product_name, amount, [asins])
+    pending = {}
+    seen_asins = set()
+    for order in orders:
         for item in order['items']:
-            category, subcategory = categorize_product_with_llm(item['product_name'], llm_categorizer)
-            print(f"      • {item['product_name'][:60]:60} ${item['total_owed']:7.2f} → {category}/{subcategory}")
-        
+            asin = item['asin']
+            if asin:
+                if asin in seen_asins or ('asin', asin) in cache:
+                    continue
+                seen_asins.add(asin)
+            name_key = normalize_product_name(item['product_name'])
+            if ('name', name_key) in cache:
+                continue
+            if name_key in pending:
+                pending[name_key][2].append(asin)
+            else:
+                pending[name_key] = (item['product_name'], item['total_owed'], [asin])
+
+    if not pending:
         return
-    
-    # Get account/source info
-    if matched_txn:
-        # Use info from matched CC transaction
-        cursor.execute("""
-            SELECT account_id, source, txn_date
-            FROM transactions
-            WHERE txn_id = %s
-        """, (matched_txn['txn_id'],))
-        
-        txn_info = cursor.fetchone()
-        if not txn_info:
-            print(f"⚠️  Could not find transaction {matched_txn['txn_id']}")
-            cursor.close()
-            return
-        
-        account_id, _, txn_date = txn_info  # Ignore original source
-        source = 'amazon_enrichment'  # Use amazon_enrichment as source
-        
-        # Delete original CC transaction since we're replacing it
-        cursor.execute("DELETE FROM transactions WHERE txn_id = %s", (matched_txn['txn_id'],))
-    else:
-        # For unmatched orders, use default account (assume Chase Credit)
-        cursor.execute("SELECT account_id FROM accounts WHERE account_name = 'Chase Credit' LIMIT 1")
-        result = cursor.fetchone()
-        account_id = result[0] if result else 2  # Default to account_id 2
-        source = 'amazon_enrichment'
-        txn_date = order['order_date']
-    
-    # Create transaction for each item
+
+    print(f"🤖 Categorizing {len(pending)} unique products...")
+    products = list(pending.items())
+    results = llm_categorizer.categorize_batch(
+        [
+            {
+                'merchant_norm': 'AMAZON',
+                'merchant_detail': product_name[:100],
+                'description_raw': f"Amazon - {product_name}",
+                'amount': float(amount),
+                'direction': 'debit',
+            }
+            for _, (product_name, amount, _) in products
+        ],
+        chunk_size=chunk_size,
+    )
+
+    for (name_key, (_, _, asins)), result in zip(products, results):
+        if not result or not result.get('category') or not result.get('subcategory'):
+            continue
+        categorized = (result['category'], result['subcategory'])
+        cache[('name', name_key)] = categorized
+        for asin in asins:
+            if asin:
+                cache[('asin', asin)] = categorized
+
+
+# Columns written for every expanded line item, in build_line_item_rows order.
+_LINE_ITEM_COLUMNS = (
+    'account_id', 'txn_date', 'post_date', 'description_raw', 'direction',
+    'amount', 'merchant_raw', 'merchant_norm', 'merchant_detail',
+    'category', 'subcategory', 'needs_review', 'source', 'source_row_hash',
+    'created_by', 'notes',
+)
+
+# Postgres types of _LINE_ITEM_COLUMNS, for the prepared insert's array params
+_LINE_ITEM_TYPES = (
+    'integer', 'date', 'date', 'text', 'text',
+    'numeric', 'text', 'text', 'text',
+    'text', 'text', 'boolean', 'text', 'text',
+    'text', 'text',
+)
+
+_INSERT_LINE_ITEMS_STATEMENT = 'amazon_insert_line_items'
+
+# One array parameter per column; unnest() zips them back into rows, so a
+# whole page is a single EXECUTE of an already-planned statement.
+_PREPARE_LINE_ITEMS_SQL = f"""
+    PREPARE {_INSERT_LINE_ITEMS_STATEMENT} ({', '.join(f'{t}[]' for t in _LINE_ITEM_TYPES)}) AS
+    INSERT INTO transactions ({', '.join(_LINE_ITEM_COLUMNS)})
+    SELECT * FROM unnest({', '.join(f'${i}' for i in range(1, len(_LINE_ITEM_COLUMNS) + 1))})
+    ON CONFLICT (source_row_hash) DO NOTHING
+"""
+
+_EXECUTE_LINE_ITEMS_SQL = (
+    f"EXECUTE {_INSERT_LINE_ITEMS_STATEMENT} ({', '.join(['%s'] * len(_LINE_ITEM_COLUMNS))})"
+)
+
+_WRITE_EXPANDED_STATEMENT = 'amazon_write_expanded_orders'
+
+# The CLI's whole write for a batch as one statement: the same unnest()
+# insert, plus deleting the CC transactions the line items replace and
+# marking the orders enriched. Matched CC transactions are deleted and
+# unmatched orders never had one, so matched_txn_id is NULL either way.
+_N_LINE_ITEM_COLUMNS = len(_LINE_ITEM_COLUMNS)
+_PREPARE_WRITE_EXPANDED_SQL = f"""
+    PREPARE {_WRITE_EXPANDED_STATEMENT} (
+        {', '.join(f'{t}[]' for t in _LINE_ITEM_TYPES)}, integer[], text[]
+    ) AS
+    WITH ins AS (
+        INSERT INTO transactions ({', '.join(_LINE_ITEM_COLUMNS)})
+        SELECT * FROM unnest({', '.join(f'${i}' for i in range(1, _N_LINE_ITEM_COLUMNS + 1))})
+        ON CONFLICT (source_row_hash) DO NOTHING
+        RETURNING 1
+    ), del AS (
+        DELETE FROM transactions
+        WHERE txn_id = ANY(${_N_LINE_ITEM_COLUMNS + 1})
+        RETURNING 1
+    ), upd AS (
+        UPDATE amazon_orders_raw
+        SET enriched = TRUE,
+            enriched_date = NOW(),
+            matched_txn_id = NULL
+        WHERE order_id = ANY(${_N_LINE_ITEM_COLUMNS + 2})
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM ins), (SELECT count(*) FROM del), (SELECT count(*) FROM upd)
+"""
+
+_EXECUTE_WRITE_EXPANDED_SQL = (
+    f"EXECUTE {_WRITE_EXPANDED_STATEMENT} ({', '.join(['%s'] * (_N_LINE_ITEM_COLUMNS + 2))})"
+)
+
+LINE_ITEM_PAGE_SIZE = 1000
+
+# Orders written per transaction by the CLI expansion
+EXPANSION_COMMIT_EVERY = 500
+
+
+def _amazon_row_hash(order_id, asin):
+    """
+    source_row_hash for an Amazon line item.
+
+    Kept as md5 so re-runs produce the same hashes as rows already in the DB
+    (ON CONFLICT relies on it); the cost is one C-level digest per item.
+    """
+    return 'amz_' + hashlib.md5(f"amazon_{order_id}_{asin}".encode()).hexdigest()[:8]
+
+
+def build_line_item_rows(order, account_id, txn_date, matched_txn, payment_source,
+                         payment_instrument=None, llm_categorizer=None, category_cache=None):
+    """
+    Build the transactions rows for one order's items, as tuples in
+    _LINE_ITEM_COLUMNS order. Writes nothing.
+    """
+    rows = []
     for item in order['items']:
-        # Categorize with LLM
-        category, subcategory = categorize_product_with_llm(item['product_name'], llm_categorizer)
-        
-        # Truncate product name to fit merchant_detail field (64 chars)
-        product_name_short = item['product_name'][:60]
-        
-        # Create source row hash for deduplication
-        import hashlib
-        hash_str = f"amazon_{order['order_id']}_{item['asin']}"
-        source_row_hash = f"amz_{hashlib.md5(hash_str.encode()).hexdigest()[:8]}"
-        
-        # Build payment note
+        category, subcategory = categorize_product_with_llm(
+            item['product_name'], llm_categorizer, category_cache, item['asin']
+        )
+
+        product_name_short = item['name_short']
+
         payment_note = build_payment_note(
             order, item, payment_source, payment_instrument, matched_txn
         )
 
-        # Insert new transaction
-        cursor.execute("""
-            INSERT INTO transactions (
-                account_id,
-                txn_date,
-                post_date,
-                description_raw,
-                direction,
-                amount,
-                merchant_raw,
-                merchant_norm,
-                merchant_detail,
-                category,
-                subcategory,
-                needs_review,
-                source,
-                source_row_hash,
-                created_by,
-                notes
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-        """, (
+        rows.append((
             account_id,
             txn_date,
             txn_date,  # post_date = txn_date for Amazon orders
@@ -315,25 +503,111 @@ def expand_amazon_order(conn, order, matched_txn, payment_source, llm_categorize
             category,
             subcategory,
             True,  # Always needs review in Phase 1
-            source,
-            source_row_hash,
             'amazon_enrichment',
-            payment_note
+            _amazon_row_hash(order['order_id'], item['asin']),  # dedup key
+            'amazon_enrichment',
+            payment_note,
         ))
-    
-    # Mark all items in this order as enriched
-    # Note: For matched orders, we deleted the CC transaction so matched_txn_id = NULL
-    # For unmatched orders, there was never a transaction so also NULL
-    cursor.execute("""
-        UPDATE amazon_orders_raw
-        SET enriched = TRUE,
-            enriched_date = NOW(),
-            matched_txn_id = NULL
-        WHERE order_id = %s
-    """, (order['order_id'],))
-    
-    conn.commit()
+    return rows
+
+
+def _line_item_columns(rows):
+    """Transpose line-item rows into one list per column (the array params)."""
+    if not rows:
+        return [[] for _ in _LINE_ITEM_COLUMNS]
+    return [list(column) for column in zip(*rows)]
+
+
+def insert_line_items(cursor, rows):
+    """Insert line-item rows, one EXECUTE of the prepared insert per page."""
+    if not rows:
+        return
+    ensure_prepared(cursor, _INSERT_LINE_ITEMS_STATEMENT, _PREPARE_LINE_ITEMS_SQL)
+    for start in range(0, len(rows), LINE_ITEM_PAGE_SIZE):
+        page = rows[start:start + LINE_ITEM_PAGE_SIZE]
+        cursor.execute(_EXECUTE_LINE_ITEMS_SQL, _line_item_columns(page))
+
+
+def preview_amazon_order(order, matched_txn, payment_source, llm_categorizer=None,
+                         payment_instrument=None, category_cache=None):
+    """Print what expanding an order would do (dry run), in one write."""
+    lines = [f"\n📦 {order['order_id']} | {order['order_date'].date()} | ${order['total']:.2f}"]
+
+    if matched_txn:
+        lines.append(f"   Matched to: txn_id={matched_txn['txn_id']} | {matched_txn['txn_date']} | ${matched_txn['amount']:.2f}")
+    else:
+        lines.append("   No CC match found")
+    lines.append(f"   Payment: {payment_instrument or payment_source}")
+
+    lines.append(f"   Would expand into {len(order['items'])} items:")
+
+    for item in order['items']:
+        category, subcategory = categorize_product_with_llm(
+            item['product_name'], llm_categorizer, category_cache, item['asin']
+        )
+        lines.append(f"      • {item['name_short']:60} ${item['total_owed']:7.2f} → {category}/{subcategory}")
+
+    print('\n'.join(lines))
+
+
+def get_default_account_id(conn):
+    """Account for unmatched orders: Chase Credit, or account_id 2 if absent."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT account_id FROM accounts WHERE account_name = 'Chase Credit' LIMIT 1")
+    result = cursor.fetchone()
     cursor.close()
+    return result[0] if result else 2
+
+
+def _order_account_and_date(order, matched_txn, default_account_id):
+    """
+    (account_id, txn_date) for an order's line items: from the matched CC
+    transaction, or the default account and order date when unmatched.
+    """
+    if matched_txn:
+        return matched_txn['account_id'], matched_txn['txn_date']
+    # order_date is a timestamp; txn_date is a date column
+    return default_account_id, order['order_date'].date()
+
+
+def write_expanded_orders(conn, rows, superseded_txn_ids, order_ids):
+    """
+    Apply a batch of expanded orders in one transaction and one statement:
+    insert their line items, delete the CC transactions they replace, and
+    mark the orders enriched. Rolls back the whole batch on error.
+
+    Each CC transaction may be superseded by one order only, and must still
+    exist: a batch that claims a charge twice, or one already deleted,
+    raises ValueError instead of double-counting the spend.
+
+    Returns (line items inserted, CC transactions deleted, orders marked).
+    """
+    superseded_txn_ids = list(superseded_txn_ids)
+    unique_txn_ids = set(superseded_txn_ids)
+    if len(unique_txn_ids) != len(superseded_txn_ids):
+        duplicates = sorted(t for t in unique_txn_ids if superseded_txn_ids.count(t) > 1)
+        raise ValueError(f"Matched transactions claimed by more than one order: {duplicates}")
+
+    cursor = conn.cursor()
+    try:
+        ensure_prepared(cursor, _WRITE_EXPANDED_STATEMENT, _PREPARE_WRITE_EXPANDED_SQL)
+        cursor.execute(
+            _EXECUTE_WRITE_EXPANDED_SQL,
+            _line_item_columns(rows) + [superseded_txn_ids, list(order_ids)],
+        )
+        counts = cursor.fetchone()
+        if counts[1] != len(unique_txn_ids):
+            raise ValueError(
+                f"Matched transactions not found: deleted {counts[1]} "
+                f"of {len(unique_txn_ids)} superseded card charges"
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return counts
 
 
 # ---------------------------------------------------------------------------
@@ -377,13 +651,17 @@ def build_enrichment_plan(conn, start_date='2023-01-01', use_llm=False):
 
     orders = get_unenriched_orders(conn, start_date)
 
+    matches = find_matching_transactions(conn, orders)
+    category_cache = load_product_category_cache(conn)
+    precategorize_products(orders, llm_categorizer, category_cache)
+
     plan_orders = []
     matched_count = 0
     line_item_count = 0
     total_amount = Decimal('0.00')
 
     for order in orders:
-        match = find_matching_transaction(conn, order['order_date'], order['total'])
+        match = matches.get(order['order_id'])
         payment_source, payment_instrument = derive_payment_source(order, match)
         if match:
             matched_count += 1
@@ -391,7 +669,7 @@ def build_enrichment_plan(conn, start_date='2023-01-01', use_llm=False):
         items = []
         for item in order['items']:
             category, subcategory = categorize_product_with_llm(
-                item['product_name'], llm_categorizer
+                item['product_name'], llm_categorizer, category_cache, item['asin']
             )
             items.append({
                 'product_name': item['product_name'],
@@ -435,26 +713,19 @@ def build_enrichment_plan(conn, start_date='2023-01-01', use_llm=False):
 
 
 def _expand_order_soft(conn, order, matched_txn, payment_source, llm_categorizer,
-                       payment_instrument=None):
+                       payment_instrument=None, category_cache=None, default_account_id=2):
     """
     Expand one order into line items, soft-superseding the matched card txn
     (exclude_from_budget = TRUE) instead of deleting it. Does NOT commit — the
     caller owns the transaction so a whole batch is atomic.
-    """
-    import hashlib
 
+    Returns the order's line-item rows; the caller inserts them for the whole
+    batch with insert_line_items.
+    """
     cursor = conn.cursor()
 
+    account_id, txn_date = _order_account_and_date(order, matched_txn, default_account_id)
     if matched_txn:
-        cursor.execute(
-            "SELECT account_id, txn_date FROM transactions WHERE txn_id = %s",
-            (matched_txn['txn_id'],),
-        )
-        row = cursor.fetchone()
-        if not row:
-            cursor.close()
-            raise ValueError(f"Matched transaction {matched_txn['txn_id']} not found")
-        account_id, txn_date = row
         # Soft-supersede: keep the original, drop it from the budget (reversible).
         cursor.execute(
             """
@@ -466,48 +737,6 @@ def _expand_order_soft(conn, order, matched_txn, payment_source, llm_categorizer
             """,
             (order['order_id'], matched_txn['txn_id']),
         )
-    else:
-        cursor.execute(
-            "SELECT account_id FROM accounts WHERE account_name = 'Chase Credit' LIMIT 1"
-        )
-        result = cursor.fetchone()
-        account_id = result[0] if result else 2
-        txn_date = order['order_date']
-
-    source = 'amazon_enrichment'
-
-    for item in order['items']:
-        category, subcategory = categorize_product_with_llm(
-            item['product_name'], llm_categorizer
-        )
-        product_name_short = item['product_name'][:60]
-        hash_str = f"amazon_{order['order_id']}_{item['asin']}"
-        source_row_hash = f"amz_{hashlib.md5(hash_str.encode()).hexdigest()[:8]}"
-
-        payment_note = build_payment_note(
-            order, item, payment_source, payment_instrument, matched_txn
-        )
-
-        cursor.execute(
-            """
-            INSERT INTO transactions (
-                account_id, txn_date, post_date, description_raw, direction,
-                amount, merchant_raw, merchant_norm, merchant_detail,
-                category, subcategory, needs_review, source, source_row_hash,
-                created_by, notes
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-            ON CONFLICT (source_row_hash) DO NOTHING
-            """,
-            (
-                account_id, txn_date, txn_date,
-                f"Amazon - {product_name_short}", 'debit',
-                float(item['total_owed']), 'AMAZON', 'AMAZON', product_name_short,
-                category, subcategory, True, source, source_row_hash,
-                'amazon_enrichment', payment_note,
-            ),
-        )
 
     cursor.execute(
         """
@@ -520,6 +749,11 @@ def _expand_order_soft(conn, order, matched_txn, payment_source, llm_categorizer
     )
     cursor.close()
 
+    return build_line_item_rows(
+        order, account_id, txn_date, matched_txn, payment_source,
+        payment_instrument, llm_categorizer, category_cache,
+    )
+
 
 def commit_enrichment(conn, order_ids, use_llm=False, start_date='2023-01-01'):
     """
@@ -550,25 +784,42 @@ def commit_enrichment(conn, order_ids, use_llm=False, start_date='2023-01-01'):
     superseded = 0
     skipped = 0
 
+    requested_orders = [all_orders[oid] for oid in requested if oid in all_orders]
+    matches = find_matching_transactions(conn, requested_orders)
+    category_cache = load_product_category_cache(conn)
+    known_categories = set(category_cache)
+    precategorize_products(requested_orders, llm_categorizer, category_cache)
+    # Persist LLM answers before writing, so a failed batch doesn't pay for them twice
+    save_product_category_cache(conn, requested_orders, category_cache, known_categories)
+    default_account_id = get_default_account_id(conn)
+
     try:
+        rows = []
         for oid in requested:
             order = all_orders.get(oid)
             if order is None:
                 skipped += 1
                 continue
-            match = find_matching_transaction(conn, order['order_date'], order['total'])
+            match = matches.get(oid)
             payment_source, payment_instrument = derive_payment_source(order, match)
-            _expand_order_soft(conn, order, match, payment_source, llm_categorizer,
-                               payment_instrument)
+            rows.extend(_expand_order_soft(
+                conn, order, match, payment_source, llm_categorizer,
+                payment_instrument, category_cache, default_account_id,
+            ))
             enriched_orders += 1
             line_items += len(order['items'])
             if match:
                 superseded += 1
+        cursor = conn.cursor()
+        insert_line_items(cursor, rows)
+        cursor.close()
         conn.commit()
     except Exception:
         conn.rollback()
         raise
 
+    save_product_category_cache(conn, requested_orders, category_cache, known_categories)
+
     return {
         'enriched_orders': enriched_orders,
         'line_items': line_items,
@@ -636,10 +887,11 @@ def enrich_amazon_orders(start_date='2023-01-01', use_llm=False, dry_run=False):
     
     matched = []
     unmatched = []
-    
+    matches = find_matching_transactions(conn, orders)
+
     for order in orders:
-        match = find_matching_transaction(conn, order['order_date'], order['total'])
-        
+        match = matches.get(order['order_id'])
+
         if match:
             matched.append({'order': order, 'transaction': match})
         else:
@@ -694,6 +946,13 @@ def enrich_amazon_orders(start_date='2023-01-01', use_llm=False, dry_run=False):
     
     print(f"  • Will create {total_items_to_create} line items")
     
+    # Shared across orders so a product bought repeatedly is categorized once;
+    # seeded with categorizations persisted by earlier runs
+    category_cache = load_product_category_cache(conn)
+    known_categories = set(category_cache)
+    if category_cache:
+        print(f"\n🗂️  Loaded {len(category_cache)} cached product categories")
+
     # Expand orders
     if dry_run:
         print(f"\n" + "=" * 80)
@@ -701,15 +960,17 @@ def enrich_amazon_orders(start_date='2023-01-01', use_llm=False, dry_run=False):
         print("=" * 80)
         
         # Show first 5 orders
+        precategorize_products(
+            [item['order'] for item in all_orders_to_enrich[:5]], llm_categorizer, category_cache
+        )
         for item in all_orders_to_enrich[:5]:
-            expand_amazon_order(
-                conn,
+            preview_amazon_order(
                 item['order'],
                 item['transaction'],
                 item['payment_source'],
                 llm_categorizer,
-                dry_run=True,
                 payment_instrument=item['payment_instrument'],
+                category_cache=category_cache,
             )
         
         if len(all_orders_to_enrich) > 5:
@@ -727,23 +988,59 @@ def enrich_amazon_orders(start_date='2023-01-01', use_llm=False, dry_run=False):
             conn.close()
             return
         
+        orders_to_enrich = [item['order'] for item in all_orders_to_enrich]
+        precategorize_products(orders_to_enrich, llm_categorizer, category_cache)
+        # Persist LLM answers before expanding: if the run dies mid-way, the
+        # enriched flag marks the orders already written and a re-run gets the
+        # rest of the categories from the cache instead of the LLM.
+        saved = save_product_category_cache(conn, orders_to_enrich, category_cache, known_categories)
+
         print(f"\n📤 Expanding {len(all_orders_to_enrich)} orders...")
-        
+
+        rows = []
+        superseded_txn_ids = []
+        order_ids = []
+        orders_written = 0
+        rows_written = 0
+        default_account_id = get_default_account_id(conn)
         for i, item in enumerate(all_orders_to_enrich, 1):
             order = item['order']
             payment_type = "CC match" if item['payment_source'] == 'credit_card' else "No CC match"
             print(f"   [{i}/{len(all_orders_to_enrich)}] {order['order_id']} ({len(order['items'])} items) - {payment_type}")
-            expand_amazon_order(
-                conn,
+
+            account_id, txn_date = _order_account_and_date(
+                order, item['transaction'], default_account_id
+            )
+
+            rows.extend(build_line_item_rows(
                 order,
+                account_id,
+                txn_date,
                 item['transaction'],
                 item['payment_source'],
+                item['payment_instrument'],
                 llm_categorizer,
-                dry_run=False,
-                payment_instrument=item['payment_instrument'],
-            )
-        
-        print(f"\n✅ Expanded {len(all_orders_to_enrich)} orders into {total_items_to_create} transactions")
+                category_cache,
+            ))
+            if item['transaction']:
+                superseded_txn_ids.append(item['transaction']['txn_id'])
+            order_ids.append(order['order_id'])
+
+            # Checkpoint: each batch commits on its own, so an interrupted run
+            # keeps what it wrote and a re-run picks up the still-unenriched rest
+            if len(order_ids) >= EXPANSION_COMMIT_EVERY or i == len(all_orders_to_enrich):
+                print(f"   💾 Writing {len(rows)} line items for {len(order_ids)} orders...")
+                inserted, _, marked = write_expanded_orders(conn, rows, superseded_txn_ids, order_ids)
+                orders_written += marked
+                rows_written += inserted  # excludes line items already present
+                rows, superseded_txn_ids, order_ids = [], [], []
+
+        # Plus anything categorized one-by-one during expansion
+        saved += save_product_category_cache(conn, orders_to_enrich, category_cache, known_categories)
+        if saved:
+            print(f"🗂️  Cached {saved} new product categories")
+
+        print(f"\n✅ Expanded {orders_written} orders into {rows_written} transactions")
         
         print("\n" + "=" * 80)
         print("✅ ENRICHMENT COMPLETE!")
@@ -752,10 +1049,10 @@ def enrich_amazon_orders(start_date='2023-01-01', use_llm=False, dry_run=False):
         print(f"   streamlit run budget_automation/dashboard.py")
         print(f"   → Review Queue tab → Filter by 'amazon_enrichment'")
         print(f"\n📊 Summary:")
-        print(f"   • Orders enriched: {len(all_orders_to_enrich)}")
+        print(f"   • Orders enriched: {orders_written}")
         print(f"   • Paid via CC: {len(matched)}")
         print(f"   • Payment unknown (likely gift card): {len(unmatched)}")
-        print(f"   • Line items created: {total_items_to_create}")
+        print(f"   • Line items created: {rows_written}")
     
     conn.close()
 
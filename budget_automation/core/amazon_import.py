@@ -7,175 +7,317 @@ Handles deduplication automatically - safe to import full history multiple times
 import csv
 import argparse
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from operator import itemgetter
 import uuid
 
+from psycopg2.extras import execute_values
+
 from budget_automation.utils.db_connection import get_db_connection
+from budget_automation.utils.pg_copy import copy_field
 
 
-def parse_amazon_csv(csv_path):
-    """Parse Amazon order history CSV"""
-    orders = []
-    
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+# Columns parsed from the CSV, in load order. import_batch_id is appended
+# per import.
+_ORDER_COLUMNS = (
+    'order_id', 'asin', 'website', 'order_date', 'purchase_order_number',
+    'currency', 'unit_price', 'unit_price_tax', 'shipping_charge',
+    'total_discounts', 'total_owed', 'shipment_item_subtotal',
+    'shipment_item_subtotal_tax', 'product_name', 'product_condition',
+    'quantity', 'payment_instrument_type', 'order_status',
+    'shipment_status', 'ship_date', 'shipping_option',
+    'shipping_address', 'billing_address', 'carrier_name_tracking',
+    'gift_message', 'gift_sender_name', 'gift_recipient_contact',
+    'item_serial_number',
+)
+_STAGING_COLUMNS = _ORDER_COLUMNS + ('import_batch_id',)
+
+# Pulls an order dict's values out as a tuple in _ORDER_COLUMNS order
+_order_values = itemgetter(*_ORDER_COLUMNS)
+
+# Bulk path: COPY into a column-only temp table, then one INSERT ... SELECT.
+# Parsed dates are UTC-aware; staging them as timestamptz keeps the
+# conversion into the timestamp columns identical to a parameterized INSERT.
+_STAGE_SQL = (
+    "CREATE TEMP TABLE amazon_orders_stage ON COMMIT DROP AS "
+    f"SELECT {', '.join(_STAGING_COLUMNS)} FROM amazon_orders_raw WITH NO DATA; "
+    "ALTER TABLE amazon_orders_stage "
+    "ALTER order_date TYPE timestamptz, ALTER ship_date TYPE timestamptz"
+)
+_COPY_SQL = (
+    f"COPY amazon_orders_stage ({', '.join(_STAGING_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT CSV)"
+)
+# Dedup against earlier imports happens server-side on the (order_id, asin)
+# primary key, so the keys never have to round-trip through Python.
+_COPY_INSERT_SQL = (
+    f"INSERT INTO amazon_orders_raw ({', '.join(_STAGING_COLUMNS)}) "
+    f"SELECT {', '.join(_STAGING_COLUMNS)} FROM amazon_orders_stage "
+    "ON CONFLICT (order_id, asin) DO NOTHING"
+)
+_NEW_IN_STAGE = """
+    NOT EXISTS (
+        SELECT 1 FROM amazon_orders_raw r
+        WHERE r.order_id = s.order_id AND r.asin = s.asin
+    )
+"""
+_COUNT_NEW_SQL = f"SELECT count(*) FROM amazon_orders_stage s WHERE {_NEW_IN_STAGE}"
+_SAMPLE_NEW_SQL = f"""
+    SELECT order_date, order_id, product_name, total_owed
+    FROM amazon_orders_stage s
+    WHERE {_NEW_IN_STAGE}
+    LIMIT %s
+"""
+
+# Multi-row INSERT for smaller loads (the web upload path)
+_INSERT_SQL = (
+    f"INSERT INTO amazon_orders_raw ({', '.join(_STAGING_COLUMNS)}) VALUES %s "
+    "ON CONFLICT (order_id, asin) DO NOTHING RETURNING 1"
+)
+
+INSERT_PAGE_SIZE = 500
+
+
+def _parse_decimal(value):
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_int(value):
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _parse_timestamp(value):
+    """
+    Parse an export timestamp. Amazon writes 'YYYY-MM-DDTHH:MM:SSZ', which is
+    sliced directly; anything else goes through fromisoformat.
+    """
+    if len(value) == 20 and value[19] == 'Z' and value[10] == 'T':
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19]),
+            tzinfo=timezone.utc,
+        )
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _available(value):
+    """Amazon writes 'Not Available' for empty gift/serial fields."""
+    return None if value == 'Not Available' else value
+
+
+# CSV header -> amazon_orders_raw column, for the plain text fields
+_TEXT_FIELDS = (
+    ('order_id', 'Order ID'),
+    ('asin', 'ASIN'),
+    ('purchase_order_number', 'Purchase Order Number'),
+    ('currency', 'Currency'),
+    ('product_name', 'Product Name'),
+    ('product_condition', 'Product Condition'),
+    ('payment_instrument_type', 'Payment Instrument Type'),
+    ('order_status', 'Order Status'),
+    ('shipment_status', 'Shipment Status'),
+    ('shipping_option', 'Shipping Option'),
+    ('shipping_address', 'Shipping Address'),
+    ('billing_address', 'Billing Address'),
+    ('carrier_name_tracking', 'Carrier Name & Tracking Number'),
+)
+_DECIMAL_FIELDS = (
+    ('unit_price', 'Unit Price'),
+    ('unit_price_tax', 'Unit Price Tax'),
+    ('shipping_charge', 'Shipping Charge'),
+    ('total_discounts', 'Total Discounts'),
+    ('total_owed', 'Total Owed'),
+    ('shipment_item_subtotal', 'Shipment Item Subtotal'),
+    ('shipment_item_subtotal_tax', 'Shipment Item Subtotal Tax'),
+)
+_OPTIONAL_FIELDS = (
+    ('gift_message', 'Gift Message'),
+    ('gift_sender_name', 'Gift Sender Name'),
+    ('gift_recipient_contact', 'Gift Recipient Contact Details'),
+    ('item_serial_number', 'Item Serial Number'),
+)
+
+
+def _header_indexes(header, fields):
+    """(field, column index or None) for each (field, CSV header) pair"""
+    positions = {name: i for i, name in enumerate(header)}
+    return tuple((field, positions.get(name)) for field, name in fields)
+
+
+def _cell(row, i):
+    """Column i of a csv.reader row; '' for a column the export doesn't have"""
+    return row[i] if i is not None else ''
+
+
+def iter_amazon_csv(csv_path):
+    """Parse Amazon order history CSV, yielding one order-item dict per row"""
+    # utf-8-sig drops the BOM Amazon puts in front of the "Website" header
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        
+        # Resolve header names to column positions once instead of building a
+        # dict per row (csv.DictReader)
+        width = len(header)
+        text_cols = _header_indexes(header, _TEXT_FIELDS)
+        decimal_cols = _header_indexes(header, _DECIMAL_FIELDS)
+        optional_cols = _header_indexes(header, _OPTIONAL_FIELDS)
+        (_, website_i), (_, order_date_i), (_, ship_date_i), (_, quantity_i) = _header_indexes(
+            header,
+            (('website', 'Website'), ('order_date', 'Order Date'),
+             ('ship_date', 'Ship Date'), ('quantity', 'Quantity')),
+        )
         
         for row in reader:
+            if not row:
+                continue
             try:
-                # Parse order date
-                order_date_str = row.get('Order Date', '').strip()
-                if order_date_str:
-                    order_date = datetime.fromisoformat(order_date_str.replace('Z', '+00:00'))
-                else:
-                    continue  # Skip rows without order date
+                if len(row) < width:
+                    raise ValueError(f"expected {width} fields, got {len(row)}")
+                
+                # Skip rows without order date
+                order_date_str = _cell(row, order_date_i).strip()
+                if not order_date_str:
+                    continue
+                
+                order = {field: _cell(row, i).strip() for field, i in text_cols}
+                if not (order['order_id'] and order['asin']):
+                    continue
+                
+                order['website'] = _cell(row, website_i).strip().strip('"')
+                order['order_date'] = _parse_timestamp(order_date_str)
                 
                 # Parse ship date (optional)
-                ship_date_str = row.get('Ship Date', '').strip()
-                ship_date = None
+                ship_date_str = _cell(row, ship_date_i).strip()
+                order['ship_date'] = None
                 if ship_date_str and ship_date_str != 'Not Available':
                     try:
-                        ship_date = datetime.fromisoformat(ship_date_str.replace('Z', '+00:00'))
-                    except:
+                        order['ship_date'] = _parse_timestamp(ship_date_str)
+                    except ValueError:
                         pass
                 
-                # Parse numeric fields
-                def parse_decimal(value):
-                    if not value or value.strip() == '':
-                        return None
-                    try:
-                        return float(value.strip())
-                    except:
-                        return None
+                for field, i in decimal_cols:
+                    order[field] = _parse_decimal(_cell(row, i).strip())
+                order['quantity'] = _parse_int(_cell(row, quantity_i).strip())
                 
-                def parse_int(value):
-                    if not value or value.strip() == '':
-                        return None
-                    try:
-                        return int(value.strip())
-                    except:
-                        return None
+                for field, i in optional_cols:
+                    value = _available(_cell(row, i))
+                    order[field] = value.strip() if value is not None else None
                 
-                order = {
-                    'order_id': row.get('Order ID', '').strip(),
-                    'asin': row.get('ASIN', '').strip(),
-                    'website': row.get('﻿"Website"', row.get('Website', '')).strip().strip('"'),
-                    'order_date': order_date,
-                    'purchase_order_number': row.get('Purchase Order Number', '').strip(),
-                    'currency': row.get('Currency', '').strip(),
-                    'unit_price': parse_decimal(row.get('Unit Price')),
-                    'unit_price_tax': parse_decimal(row.get('Unit Price Tax')),
-                    'shipping_charge': parse_decimal(row.get('Shipping Charge')),
-                    'total_discounts': parse_decimal(row.get('Total Discounts')),
-                    'total_owed': parse_decimal(row.get('Total Owed')),
-                    'shipment_item_subtotal': parse_decimal(row.get('Shipment Item Subtotal')),
-                    'shipment_item_subtotal_tax': parse_decimal(row.get('Shipment Item Subtotal Tax')),
-                    'product_name': row.get('Product Name', '').strip(),
-                    'product_condition': row.get('Product Condition', '').strip(),
-                    'quantity': parse_int(row.get('Quantity')),
-                    'payment_instrument_type': row.get('Payment Instrument Type', '').strip(),
-                    'order_status': row.get('Order Status', '').strip(),
-                    'shipment_status': row.get('Shipment Status', '').strip(),
-                    'ship_date': ship_date,
-                    'shipping_option': row.get('Shipping Option', '').strip(),
-                    'shipping_address': row.get('Shipping Address', '').strip(),
-                    'billing_address': row.get('Billing Address', '').strip(),
-                    'carrier_name_tracking': row.get('Carrier Name & Tracking Number', '').strip(),
-                    'gift_message': row.get('Gift Message', '').strip() if row.get('Gift Message') != 'Not Available' else None,
-                    'gift_sender_name': row.get('Gift Sender Name', '').strip() if row.get('Gift Sender Name') != 'Not Available' else None,
-                    'gift_recipient_contact': row.get('Gift Recipient Contact Details', '').strip() if row.get('Gift Recipient Contact Details') != 'Not Available' else None,
-                    'item_serial_number': row.get('Item Serial Number', '').strip() if row.get('Item Serial Number') != 'Not Available' else None,
-                }
-                
-                # Validate required fields
-                if order['order_id'] and order['asin']:
-                    orders.append(order)
+                yield order
                     
             except Exception as e:
                 print(f"⚠️  Skipping malformed row: {e}")
                 continue
-    
-    return orders
 
 
-def stage_amazon_orders(conn, csv_path):
-    """
-    Non-interactive Amazon order staging for the web API.
+def parse_amazon_csv(csv_path):
+    """Parse Amazon order history CSV"""
+    return list(iter_amazon_csv(csv_path))
 
-    Parses the CSV, dedups within the file and against the DB on (order_id, asin),
-    inserts the new rows into amazon_orders_raw, and commits.
 
-    Returns: {"parsed", "duplicates_in_csv", "already_imported", "inserted",
-              "batch_id"}
+def _unique_orders(orders, counts):
+    """
+    Yield the first occurrence of each (order_id, asin) - the same item can
+    appear more than once in an export. Tallies 'parsed' and
+    'duplicates_in_csv' into counts as the rows stream through.
     """
-    orders = parse_amazon_csv(csv_path)
-    parsed = len(orders)
-
-    # Dedup within the file.
     seen = set()
-    unique = []
-    duplicates_in_csv = 0
-    for o in orders:
-        key = (o['order_id'], o['asin'])
+    for order in orders:
+        counts['parsed'] += 1
+        # One joined string per key rather than a tuple holding two
+        key = f"{order['order_id']}\x00{order['asin']}"
         if key in seen:
-            duplicates_in_csv += 1
+            counts['duplicates_in_csv'] += 1
             continue
         seen.add(key)
-        unique.append(o)
-    orders = unique
-
-    if not orders:
-        return {
-            'parsed': parsed,
-            'duplicates_in_csv': duplicates_in_csv,
-            'already_imported': 0,
-            'inserted': 0,
-            'batch_id': None,
-        }
+        yield order
 
-    cursor = conn.cursor()
-    batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-    order_keys = [(o['order_id'], o['asin']) for o in orders]
-    placeholders = ','.join(['(%s, %s)'] * len(order_keys))
-    flat_keys = [v for pair in order_keys for v in pair]
-    cursor.execute(
-        f"SELECT order_id, asin FROM amazon_orders_raw WHERE (order_id, asin) IN ({placeholders})",
-        flat_keys,
-    )
-    existing = set(cursor.fetchall())
-    new_orders = [o for o in orders if (o['order_id'], o['asin']) not in existing]
-
-    insert_query = """
-        INSERT INTO amazon_orders_raw (
-            order_id, asin, website, order_date, purchase_order_number,
-            currency, unit_price, unit_price_tax, shipping_charge,
-            total_discounts, total_owed, shipment_item_subtotal,
-            shipment_item_subtotal_tax, product_name, product_condition,
-            quantity, payment_instrument_type, order_status,
-            shipment_status, ship_date, shipping_option,
-            shipping_address, billing_address, carrier_name_tracking,
-            gift_message, gift_sender_name, gift_recipient_contact,
-            item_serial_number, import_batch_id
-        ) VALUES (
-            %(order_id)s, %(asin)s, %(website)s, %(order_date)s,
-            %(purchase_order_number)s, %(currency)s, %(unit_price)s,
-            %(unit_price_tax)s, %(shipping_charge)s, %(total_discounts)s,
-            %(total_owed)s, %(shipment_item_subtotal)s,
-            %(shipment_item_subtotal_tax)s, %(product_name)s,
-            %(product_condition)s, %(quantity)s, %(payment_instrument_type)s,
-            %(order_status)s, %(shipment_status)s, %(ship_date)s,
-            %(shipping_option)s, %(shipping_address)s, %(billing_address)s,
-            %(carrier_name_tracking)s, %(gift_message)s, %(gift_sender_name)s,
-            %(gift_recipient_contact)s, %(item_serial_number)s, %(batch_id)s
+class _CopyReader:
+    """
+    Read-only file object that renders orders as COPY CSV lines on demand,
+    so copy_expert pulls rows straight from the CSV parser instead of a
+    fully built buffer.
+    """
+
+    def __init__(self, orders, batch_id):
+        tail = "," + copy_field(batch_id) + "\n"
+        self._lines = (
+            ",".join(map(copy_field, _order_values(order))) + tail
+            for order in orders
         )
+        self._pending = ""
+
+    def read(self, size=-1):
+        parts = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0:
+            self._pending = ""
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+
+def _stage_orders(cursor, orders, batch_id):
+    """
+    COPY parsed orders (any iterable) into the amazon_orders_stage temp table
+    (dropped at commit/rollback). _COPY_INSERT_SQL then moves the new ones across.
+    """
+    cursor.execute(_STAGE_SQL)
+    cursor.copy_expert(_COPY_SQL, _CopyReader(orders, batch_id))
+
+
+def _insert_orders(cursor, orders, batch_id):
     """
+    Insert parsed orders with execute_values: one multi-row INSERT per
+    INSERT_PAGE_SIZE rows, positional tuples in _STAGING_COLUMNS order.
+    Rows already imported are skipped by ON CONFLICT. Does not commit.
+
+    Returns the number of rows inserted.
+    """
+    rows = (_order_values(o) + (batch_id,) for o in orders)
+    inserted = execute_values(cursor, _INSERT_SQL, rows, page_size=INSERT_PAGE_SIZE, fetch=True)
+    return len(inserted)
+
+
+def stage_amazon_orders(conn, csv_path):
+    """
+    Non-interactive Amazon order staging for the web API.
+
+    Parses the CSV, dedups within the file, inserts into amazon_orders_raw
+    (rows already imported are skipped on the (order_id, asin) key), and commits.
+
+    Returns: {"parsed", "duplicates_in_csv", "already_imported", "inserted",
+              "batch_id"}
+    """
+    counts = {'parsed': 0, 'duplicates_in_csv': 0}
+    orders = _unique_orders(iter_amazon_csv(csv_path), counts)
+
+    cursor = conn.cursor()
+    batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-    inserted = 0
     try:
-        for o in new_orders:
-            o['batch_id'] = batch_id
-            cursor.execute(insert_query, o)
-            inserted += 1
+        inserted = _insert_orders(cursor, orders, batch_id)
         conn.commit()
     except Exception:
         conn.rollback()
@@ -183,12 +325,13 @@ def stage_amazon_orders(conn, csv_path):
         raise
 
     cursor.close()
+    unique = counts['parsed'] - counts['duplicates_in_csv']
     return {
-        'parsed': parsed,
-        'duplicates_in_csv': duplicates_in_csv,
-        'already_imported': len(orders) - len(new_orders),
+        'parsed': counts['parsed'],
+        'duplicates_in_csv': counts['duplicates_in_csv'],
+        'already_imported': unique - inserted,
         'inserted': inserted,
-        'batch_id': batch_id,
+        'batch_id': batch_id if unique else None,
     }
 
 
@@ -207,34 +350,6 @@ def import_amazon_orders(csv_path, dry_run=False):
     print(f"Dry Run: {dry_run}")
     print("=" * 80)
     
-    # Parse CSV
-    print("\n📄 Parsing Amazon order history CSV...")
-    orders = parse_amazon_csv(csv_path)
-    print(f"✅ Parsed {len(orders)} order items from CSV")
-    
-    # Deduplicate within CSV (same order_id + asin can appear multiple times)
-    seen_keys = set()
-    unique_orders = []
-    duplicates_in_csv = 0
-    
-    for order in orders:
-        key = (order['order_id'], order['asin'])
-        if key not in seen_keys:
-            seen_keys.add(key)
-            unique_orders.append(order)
-        else:
-            duplicates_in_csv += 1
-    
-    if duplicates_in_csv > 0:
-        print(f"⚠️  Found {duplicates_in_csv} duplicate items within CSV (kept first occurrence)")
-    
-    orders = unique_orders
-    print(f"✅ {len(orders)} unique order items to process")
-    
-    if not orders:
-        print("⚠️  No valid orders found in CSV")
-        return
-    
     # Connect to database
     print("\n🔌 Connecting to database...")
     conn = get_db_connection()
@@ -244,96 +359,90 @@ def import_amazon_orders(csv_path, dry_run=False):
     # Generate batch ID for this import
     batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    # Check for existing orders
-    print("\n🔍 Checking for existing orders...")
-    order_keys = [(o['order_id'], o['asin']) for o in orders]
+    # Stream the CSV straight into a temp table (deduplicating within the file
+    # on the way) and count what's new server-side; nothing touches
+    # amazon_orders_raw until the import is confirmed
+    print("\n📄 Loading Amazon order history CSV...")
+    counts = {'parsed': 0, 'duplicates_in_csv': 0}
+    try:
+        _stage_orders(cursor, _unique_orders(iter_amazon_csv(csv_path), counts), batch_id)
+        cursor.execute(_COUNT_NEW_SQL)
+        new_count = cursor.fetchone()[0]
+        cursor.execute(_SAMPLE_NEW_SQL, (5,))
+        sample = cursor.fetchall()
+    except Exception:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        raise
+    print(f"✅ Parsed {counts['parsed']} order items from CSV")
     
-    # Build query to check existing
-    placeholders = ','.join(['(%s, %s)'] * len(order_keys))
-    check_query = f"""
-        SELECT order_id, asin
-        FROM amazon_orders_raw
-        WHERE (order_id, asin) IN ({placeholders})
-    """
+    duplicates_in_csv = counts['duplicates_in_csv']
+    if duplicates_in_csv > 0:
+        print(f"⚠️  Found {duplicates_in_csv} duplicate items within CSV (kept first occurrence)")
     
-    flat_keys = [item for sublist in order_keys for item in sublist]
-    cursor.execute(check_query, flat_keys)
-    existing_keys = set(cursor.fetchall())
+    unique_count = counts['parsed'] - duplicates_in_csv
+    print(f"✅ {unique_count} unique order items to process")
     
-    print(f"✅ Found {len(existing_keys)} existing order items")
+    if not unique_count:
+        print("⚠️  No valid orders found in CSV")
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        return
+    
+    duplicate_orders = unique_count - new_count
     
-    # Filter to new orders only
-    new_orders = [o for o in orders if (o['order_id'], o['asin']) not in existing_keys]
-    duplicate_orders = len(orders) - len(new_orders)
+    print(f"✅ Found {duplicate_orders} existing order items")
     
     print(f"\n📊 Summary:")
-    print(f"  • Total in CSV: {len(orders)}")
+    print(f"  • Total in CSV: {unique_count}")
     print(f"  • Already imported: {duplicate_orders}")
-    print(f"  • New to import: {len(new_orders)}")
+    print(f"  • New to import: {new_count}")
     
-    if not new_orders:
+    if not new_count:
         print("\n✅ All orders already imported! Nothing to do.")
+        conn.rollback()
         cursor.close()
         conn.close()
         return
     
     # Show sample of new orders
     print(f"\n📋 Sample of new orders (first 5):")
-    for order in new_orders[:5]:
-        print(f"  • {order['order_date'].date()} | {order['order_id']} | {order['product_name'][:50]} | ${order['total_owed']:.2f}")
+    for order_date, order_id, product_name, total_owed in sample:
+        print(f"  • {order_date.date()} | {order_id} | {product_name[:50]} | ${total_owed:.2f}")
     
-    if len(new_orders) > 5:
-        print(f"  ... and {len(new_orders) - 5} more")
+    if new_count > 5:
+        print(f"  ... and {new_count - 5} more")
     
     # Execute import
     if dry_run:
+        conn.rollback()
         print("\n" + "=" * 80)
         print("DRY RUN - No changes made")
         print("=" * 80)
     else:
         print("\n" + "=" * 80)
-        response = input(f"Import {len(new_orders)} new orders? (y/n): ")
+        response = input(f"Import {new_count} new orders? (y/n): ")
         
         if response.lower() != 'y':
             print("❌ Cancelled")
+            conn.rollback()
             cursor.close()
             conn.close()
             return
         
-        print(f"\n📥 Importing {len(new_orders)} orders...")
-        
-        insert_query = """
-            INSERT INTO amazon_orders_raw (
-                order_id, asin, website, order_date, purchase_order_number,
-                currency, unit_price, unit_price_tax, shipping_charge, 
-                total_discounts, total_owed, shipment_item_subtotal,
-                shipment_item_subtotal_tax, product_name, product_condition,
-                quantity, payment_instrument_type, order_status, 
-                shipment_status, ship_date, shipping_option,
-                shipping_address, billing_address, carrier_name_tracking,
-                gift_message, gift_sender_name, gift_recipient_contact,
-                item_serial_number, import_batch_id
-            ) VALUES (
-                %(order_id)s, %(asin)s, %(website)s, %(order_date)s, 
-                %(purchase_order_number)s, %(currency)s, %(unit_price)s, 
-                %(unit_price_tax)s, %(shipping_charge)s, %(total_discounts)s,
-                %(total_owed)s, %(shipment_item_subtotal)s, 
-                %(shipment_item_subtotal_tax)s, %(product_name)s, 
-                %(product_condition)s, %(quantity)s, %(payment_instrument_type)s,
-                %(order_status)s, %(shipment_status)s, %(ship_date)s,
-                %(shipping_option)s, %(shipping_address)s, %(billing_address)s,
-                %(carrier_name_tracking)s, %(gift_message)s, %(gift_sender_name)s,
-                %(gift_recipient_contact)s, %(item_serial_number)s, %(batch_id)s
-            )
-        """
-        
-        inserted = 0
-        for order in new_orders:
-            order['batch_id'] = batch_id
-            cursor.execute(insert_query, order)
-            inserted += 1
+        print(f"\n📥 Importing {new_count} orders...")
         
-        conn.commit()
+        try:
+            cursor.execute(_COPY_INSERT_SQL)
+            inserted = cursor.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            cursor.close()
+            conn.close()
+            raise
         
         print(f"✅ Imported {inserted} order items")
         
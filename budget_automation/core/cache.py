@@ -0,0 +1,85 @@
+"""
+On-disk cache for the categorization inputs (taxonomy + active merchant rules).
+
+Every import builds a CategorizationOrchestrator from the taxonomy tables and
+the active rules. Rather than pulling every row over the wire on each CLI run,
+ask Postgres for an md5 fingerprint of those tables (one row, a few dozen bytes)
+and reuse a pickled copy from the last run when the fingerprint is unchanged.
+
+merchant_rules has no updated_at column, so the fingerprint hashes the row text
+server-side instead of relying on max(updated_at) + count(*), which would miss
+in-place edits and deletes.
+
+The cache lives in $BUDGET_CACHE_DIR (default ~/.cache/budget_automation). Any
+cache read/write problem falls back to loading from the DB.
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .categorization_orchestrator import load_rules_from_db
+from .taxonomy_db import load_taxonomy_from_db
+
+
+CACHE_DIR = Path(
+    os.getenv("BUDGET_CACHE_DIR", Path.home() / ".cache" / "budget_automation")
+)
+
+_FINGERPRINT_SQL = """
+    SELECT
+        (SELECT md5(COALESCE(string_agg(r::text, E'\\n' ORDER BY r.rule_id), ''))
+         FROM merchant_rules r WHERE r.is_active = TRUE),
+        (SELECT md5(COALESCE(string_agg(c::text, E'\\n' ORDER BY c.category), ''))
+         FROM taxonomy_categories c),
+        (SELECT md5(COALESCE(string_agg(s::text, E'\\n' ORDER BY s.category, s.subcategory), ''))
+         FROM taxonomy_subcategories s)
+"""
+
+
+def categorization_fingerprint(conn) -> str:
+    """Return a short key that changes whenever the active rules or the
+    taxonomy tables change."""
+    cursor = conn.cursor()
+    cursor.execute(_FINGERPRINT_SQL)
+    parts = cursor.fetchone()
+    cursor.close()
+    return hashlib.md5("|".join(parts).encode()).hexdigest()[:16]
+
+
+def load_categorization_inputs(conn) -> Tuple[Dict, List[Dict]]:
+    """
+    Return (taxonomy, rules) for building an orchestrator, from the on-disk
+    cache when the DB fingerprint matches, otherwise from the DB (refreshing
+    the cache).
+    """
+    try:
+        fingerprint = categorization_fingerprint(conn)
+    except Exception:
+        conn.rollback()
+        return load_taxonomy_from_db(conn), load_rules_from_db(conn)
+
+    cache_file = CACHE_DIR / f"categorization-{fingerprint}.pkl"
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+
+    inputs = (load_taxonomy_from_db(conn), load_rules_from_db(conn))
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, "wb") as f:
+            pickle.dump(inputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+        # Only the current fingerprint is ever useful again.
+        for stale in CACHE_DIR.glob("categorization-*.pkl"):
+            if stale != cache_file:
+                stale.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+    return inputs
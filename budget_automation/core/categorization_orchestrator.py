@@ -15,9 +15,9 @@ from .rule_matcher import RuleMatcher, CategorizationResult
 from .llm_categorizer import LLMCategorizer
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
-    """Transaction data structure"""
+    """Transaction data structure (slotted: one is built per imported row)"""
     txn_id: Optional[int]
     merchant_norm: str
     merchant_detail: Optional[str]
@@ -40,6 +40,11 @@ class Transaction:
     notes: Optional[str] = None
 
 
+def _llm_key(txn: Transaction):
+    """Transactions that would send the LLM the same merchant question"""
+    return (txn.merchant_norm, txn.merchant_detail, txn.direction)
+
+
 class CategorizationOrchestrator:
     """
     Orchestrates transaction categorization using multiple strategies
@@ -94,66 +99,47 @@ class CategorizationOrchestrator:
         Returns:
             Updated transaction with categorization
         """
-        self.stats['total'] += 1
+        return self.categorize_batch([txn])[0]
+    
+    def _apply_rule_result(self, txn: Transaction, result: CategorizationResult):
+        """Fill txn from a rule match"""
+        txn.category = result.category
+        txn.subcategory = result.subcategory
+        txn.category_source = 'rule'
+        txn.category_confidence = result.category_confidence
+        txn.needs_review = False
+        txn.notes = result.rationale
         
-        # Step 1: Try rule matching
-        result = self.rule_matcher.categorize(
-            txn.merchant_norm,
-            txn.merchant_detail,
-            txn.description_raw
-        )
+        self.stats['rule_match'] += 1
+        self.stats['high_confidence'] += 1
+    
+    def _apply_llm_result(self, txn: Transaction, llm_result: Dict):
+        """Fill txn from an LLM suggestion, flagging it below the review threshold"""
+        txn.category = llm_result['category']
+        txn.subcategory = llm_result['subcategory']
+        txn.category_source = 'llm'
+        txn.category_confidence = llm_result['confidence']
+        txn.notes = llm_result.get('rationale', 'LLM suggestion')
         
-        # If rule matched, use it
-        if result.category != 'Uncategorized':
-            txn.category = result.category
-            txn.subcategory = result.subcategory
-            txn.category_source = 'rule'
-            txn.category_confidence = result.category_confidence
+        if txn.category_confidence >= self.review_threshold:
             txn.needs_review = False
-            txn.notes = result.rationale
-            
-            self.stats['rule_match'] += 1
             self.stats['high_confidence'] += 1
-            return txn
-        
-        # Step 2: Try LLM suggestion (if enabled)
-        if self.enable_llm and self.llm_categorizer:
-            llm_result = self.llm_categorizer.categorize(
-                txn.merchant_norm,
-                txn.merchant_detail,
-                txn.description_raw,
-                txn.amount,
-                txn.direction
-            )
-            
-            if llm_result:
-                txn.category = llm_result['category']
-                txn.subcategory = llm_result['subcategory']
-                txn.category_source = 'llm'
-                txn.category_confidence = llm_result['confidence']
-                txn.notes = llm_result['rationale']
-                
-                # Check if confidence meets threshold
-                if txn.category_confidence >= self.review_threshold:
-                    txn.needs_review = False
-                    self.stats['high_confidence'] += 1
-                else:
-                    txn.needs_review = True
-                    self.stats['needs_review'] += 1
-                
-                self.stats['llm_suggest'] += 1
-                return txn
+        else:
+            txn.needs_review = True
+            self.stats['needs_review'] += 1
         
-        # Step 3: No match, no LLM, or LLM failed -> needs review
+        self.stats['llm_suggest'] += 1
+    
+    def _mark_needs_review(self, txn: Transaction, notes: str):
+        """No match, no LLM, or LLM failed -> needs review"""
         txn.category = 'Uncategorized'
         txn.subcategory = 'Needs Review'
         txn.category_source = 'none'
         txn.category_confidence = 0.0
         txn.needs_review = True
-        txn.notes = 'No matching rule or LLM suggestion'
+        txn.notes = notes
         
         self.stats['needs_review'] += 1
-        return txn
     
     def categorize_batch(self, transactions: List[Transaction]) -> List[Transaction]:
         """
@@ -181,22 +167,20 @@ class CategorizationOrchestrator:
             
             if result.category != 'Uncategorized':
                 # Rule matched
-                txn.category = result.category
-                txn.subcategory = result.subcategory
-                txn.category_source = 'rule'
-                txn.category_confidence = 1.0
-                txn.needs_review = False
-                txn.notes = result.rationale
-                
+                self._apply_rule_result(txn, result)
                 categorized.append(txn)
-                self.stats['rule_match'] += 1
-                self.stats['high_confidence'] += 1
             else:
                 # No rule match
                 uncategorized.append(txn)
         
         # Second pass: LLM for uncategorized (if enabled)
         if uncategorized and self.enable_llm and self.llm_categorizer:
+            # Repeat merchants get the same answer, so ask once per
+            # (merchant_norm, merchant_detail, direction) and fan it back out
+            representatives = {}
+            for t in uncategorized:
+                representatives.setdefault(_llm_key(t), t)
+            
             # Batch LLM call
             llm_results = self.llm_categorizer.categorize_batch([
                 {
@@ -206,46 +190,22 @@ class CategorizationOrchestrator:
                     'amount': t.amount,
                     'direction': t.direction,
                 }
-                for t in uncategorized
+                for t in representatives.values()
             ])
+            results_by_key = dict(zip(representatives, llm_results))
             
-            for txn, llm_result in zip(uncategorized, llm_results):
+            for txn in uncategorized:
+                llm_result = results_by_key[_llm_key(txn)]
                 if llm_result:
-                    txn.category = llm_result['category']
-                    txn.subcategory = llm_result['subcategory']
-                    txn.category_source = 'llm'
-                    txn.category_confidence = llm_result['confidence']
-                    txn.notes = llm_result.get('rationale', 'LLM suggestion')
-                    
-                    if txn.category_confidence >= self.review_threshold:
-                        txn.needs_review = False
-                        self.stats['high_confidence'] += 1
-                    else:
-                        txn.needs_review = True
-                        self.stats['needs_review'] += 1
-                    
-                    self.stats['llm_suggest'] += 1
+                    self._apply_llm_result(txn, llm_result)
                 else:
                     # LLM failed
-                    txn.category = 'Uncategorized'
-                    txn.subcategory = 'Needs Review'
-                    txn.category_source = 'none'
-                    txn.category_confidence = 0.0
-                    txn.needs_review = True
-                    txn.notes = 'No matching rule or LLM suggestion'
-                    self.stats['needs_review'] += 1
-                
+                    self._mark_needs_review(txn, 'No matching rule or LLM suggestion')
                 categorized.append(txn)
         else:
             # No LLM, mark all as needs review
             for txn in uncategorized:
-                txn.category = 'Uncategorized'
-                txn.subcategory = 'Needs Review'
-                txn.category_source = 'none'
-                txn.category_confidence = 0.0
-                txn.needs_review = True
-                txn.notes = 'No matching rule'
-                self.stats['needs_review'] += 1
+                self._mark_needs_review(txn, 'No matching rule')
                 categorized.append(txn)
         
         self.stats['total'] += len(transactions)
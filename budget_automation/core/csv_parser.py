@@ -3,15 +3,55 @@ CSV Parser for Chase Bank Exports
 
 Handles both checking and credit card CSV formats from Chase.
 """
+import codecs
 import csv
 import hashlib
 from datetime import datetime
 from decimal import Decimal
+from operator import itemgetter
 from typing import Dict, List, Optional
 from pathlib import Path
 
 from .merchant_normalizer import normalize_merchant
 
+# Read buffer for CSV paths: a multi-MB export is read in a few large
+# read() calls instead of one per 8 KiB default buffer.
+CSV_BUFFER_SIZE = 1 << 20
+
+
+def _open_csv(csv_path: Path):
+    """Open a CSV export as UTF-8 text (BOM dropped) with a large read buffer"""
+    return open(csv_path, 'r', encoding='utf-8-sig', buffering=CSV_BUFFER_SIZE)
+
+
+# Date formats seen in Chase exports, tried in order. %m and %d also accept
+# unpadded values ('1/5/2025'), so no separate no-leading-zero variants.
+_DATE_FORMATS = (
+    '%m/%d/%Y',      # 01/30/2025
+    '%m/%d/%y',      # 1/30/23
+    '%Y-%m-%d',      # 2025-01-30
+)
+
+
+def _iter_columns(f, names):
+    """
+    Yield the named columns of each CSV row as a tuple, in `names` order.
+
+    Header names are resolved to positions once, so rows stay plain lists
+    instead of one csv.DictReader dict each. Blank lines are skipped; a
+    missing column raises KeyError.
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    positions = {name: i for i, name in enumerate(header)}
+    pick = itemgetter(*[positions[name] for name in names])
+    for row in reader:
+        if row:
+            yield pick(row)
+
+
 class TransactionParser:
     """Base class for parsing Chase CSV exports"""
     
@@ -20,6 +60,9 @@ class TransactionParser:
         # Tracks, per content key, how many identical rows we've already seen in
         # THIS file so each gets a stable occurrence number (1, 2, 3, ...).
         self._occurrence_counts: Dict[str, int] = {}
+        # A statement repeats the same few dozen dates; parse each one once.
+        self._date_cache: Dict[str, Optional[str]] = {}
+        self._date_format: Optional[str] = None
 
     def compute_row_hash(self, row_dict: Dict[str, str]) -> str:
         """
@@ -38,6 +81,10 @@ class TransactionParser:
 
         unlike the old scheme which hashed raw CSV row position and broke when
         unrelated rows shifted (the TECH_DEBT re-import duplicate bug).
+
+        The digest is what transactions.source_row_hash (UNIQUE) stores, so the
+        algorithm and key format can't change without re-hashing every
+        existing row; otherwise a re-import would no longer dedup.
         """
         content_key = (
             f"{row_dict.get('txn_date', '')}"
@@ -52,30 +99,34 @@ class TransactionParser:
         return hashlib.sha256(hash_input.encode()).hexdigest()
     
     def parse_date(self, date_str: str) -> Optional[str]:
-        """Parse date string to YYYY-MM-DD format"""
+        """Parse date string to YYYY-MM-DD format (memoized per parser)"""
+        try:
+            return self._date_cache[date_str]
+        except KeyError:
+            pass
+        parsed = self._date_cache[date_str] = self._parse_date(date_str)
+        return parsed
+
+    def _parse_date(self, date_str: str) -> Optional[str]:
         if not date_str:
             return None
         
-        from datetime import datetime
-        
-        # Try multiple date formats
-        formats = [
-            '%m/%d/%Y',      # 01/30/2025
-            '%m/%d/%y',      # 1/30/23
-            '%-m/%-d/%Y',    # 1/30/2025 (no leading zeros)
-            '%-m/%-d/%y',    # 1/30/23
-            '%Y-%m-%d',      # 2025-01-30
-        ]
+        # A file uses one format throughout, so try the last one that worked
+        # first instead of failing through the list on every row
+        formats = _DATE_FORMATS
+        if self._date_format is not None:
+            formats = (self._date_format,) + formats
         
         for fmt in formats:
             try:
                 dt = datetime.strptime(date_str, fmt)
-                # If 2-digit year, assume 2000s
-                if dt.year < 100:
-                    dt = dt.replace(year=dt.year + 2000)
-                return dt.strftime('%Y-%m-%d')
             except ValueError:
                 continue
+            self._date_format = fmt
+            # If 2-digit year, assume 2000s
+            if dt.year < 100:
+                dt = dt.replace(year=dt.year + 2000)
+            return dt.strftime('%Y-%m-%d')
         
         raise ValueError(f"Could not parse date: {date_str}")
     
@@ -93,6 +144,7 @@ class CheckingParser(TransactionParser):
     """Parser for Chase Checking CSV format"""
     
     # Expected columns: Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #
+    COLUMNS = ('Details', 'Posting Date', 'Description', 'Amount', 'Type')
     
     def parse(self, csv_path: Path, account_id: int = 1) -> List[Dict]:
         """
@@ -107,14 +159,12 @@ class CheckingParser(TransactionParser):
         """
         transactions = []
         
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-
-            for row in reader:
+        with _open_csv(csv_path) as f:
+            for details, posting_date, description, amount_str, txn_type in _iter_columns(f, self.COLUMNS):
                 # Parse basic fields
-                description_raw = row['Description'].strip()
-                amount = self.parse_amount(row['Amount'])
-                post_date = self.parse_date(row['Posting Date'])
+                description_raw = description.strip()
+                amount = self.parse_amount(amount_str)
+                post_date = self.parse_date(posting_date)
                 txn_date = post_date  # Checking doesn't have separate transaction date
                 
                 # Determine direction
@@ -125,7 +175,7 @@ class CheckingParser(TransactionParser):
                 merchant_norm, merchant_detail = normalize_merchant(description_raw)
                 
                 # Determine if this is a return
-                is_return = row['Details'].strip().upper() == 'RETURN'
+                is_return = details.strip().upper() == 'RETURN'
                 
                 # Build transaction dict
                 txn = {
@@ -140,7 +190,7 @@ class CheckingParser(TransactionParser):
                     'amount': amount,
                     'currency': 'USD',
                     'direction': direction,
-                    'type': row['Type'].strip(),
+                    'type': txn_type.strip(),
                     'is_return': is_return,
                     'memo': None,
                     'created_by': 'import',
@@ -159,6 +209,7 @@ class CreditParser(TransactionParser):
     """Parser for Chase Credit Card CSV format"""
     
     # Expected columns: Transaction Date,Post Date,Description,Category,Type,Amount,Memo
+    COLUMNS = ('Transaction Date', 'Post Date', 'Description', 'Type', 'Amount', 'Memo')
     
     def parse(self, csv_path: Path, account_id: int = 2) -> List[Dict]:
         """
@@ -173,15 +224,14 @@ class CreditParser(TransactionParser):
         """
         transactions = []
         
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-
-            for row in reader:
+        with _open_csv(csv_path) as f:
+            for (transaction_date, posting_date, description, txn_type,
+                 amount_str, memo) in _iter_columns(f, self.COLUMNS):
                 # Parse basic fields
-                description_raw = row['Description'].strip()
-                amount = self.parse_amount(row['Amount'])
-                txn_date = self.parse_date(row['Transaction Date'])
-                post_date = self.parse_date(row['Post Date'])
+                description_raw = description.strip()
+                amount = self.parse_amount(amount_str)
+                txn_date = self.parse_date(transaction_date)
+                post_date = self.parse_date(posting_date)
                 
                 # Determine direction (negative = debit for credit cards)
                 direction = 'credit' if amount > 0 else 'debit'
@@ -191,7 +241,7 @@ class CreditParser(TransactionParser):
                 merchant_norm, merchant_detail = normalize_merchant(description_raw)
                 
                 # Determine if this is a return
-                is_return = row['Type'].strip().upper() == 'RETURN'
+                is_return = txn_type.strip().upper() == 'RETURN'
                 
                 # Build transaction dict
                 txn = {
@@ -206,9 +256,9 @@ class CreditParser(TransactionParser):
                     'amount': amount,
                     'currency': 'USD',
                     'direction': direction,
-                    'type': row['Type'].strip(),
+                    'type': txn_type.strip(),
                     'is_return': is_return,
-                    'memo': row['Memo'].strip() if row['Memo'] else None,
+                    'memo': memo.strip() if memo else None,
                     'created_by': 'import',
                 }
                 
@@ -221,6 +271,26 @@ class CreditParser(TransactionParser):
         return transactions
 
 
+# Chase header prefixes, compared against the first bytes of the file
+_CREDIT_HEADER = b'Transaction Date,Post Date,Description,Category,Type,Amount,Memo'
+_CHECKING_HEADER = b'Details,Posting Date,Description,Amount,Type,Balance'
+_SNIFF_BYTES = 128
+
+
+def _sniff_csv_type(csv_path: Path) -> str:
+    """Tell credit from checking by the header prefix (reads at most 128 bytes)"""
+    with open(csv_path, 'rb') as f:
+        head = f.read(_SNIFF_BYTES)
+    head = head.removeprefix(codecs.BOM_UTF8)
+
+    if head.startswith(_CREDIT_HEADER):
+        return 'credit'
+    if head.startswith(_CHECKING_HEADER):
+        return 'checking'
+    header = head.split(b'\n', 1)[0].decode('utf-8', 'replace').strip()
+    raise ValueError(f"Unknown CSV format. Header: {header}")
+
+
 def parse_chase_csv(csv_path: Path, csv_type: str = 'auto', account_id: Optional[int] = None) -> List[Dict]:
     """
     Parse a Chase CSV file (auto-detects type or uses specified type)
@@ -237,14 +307,7 @@ def parse_chase_csv(csv_path: Path, csv_type: str = 'auto', account_id: Optional
     
     # Auto-detect CSV type if not specified
     if csv_type == 'auto':
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            header = f.readline().strip()
-            if 'Transaction Date,Post Date,Description,Category,Type,Amount,Memo' in header:
-                csv_type = 'credit'
-            elif 'Details,Posting Date,Description,Amount,Type,Balance' in header:
-                csv_type = 'checking'
-            else:
-                raise ValueError(f"Unknown CSV format. Header: {header}")
+        csv_type = _sniff_csv_type(csv_path)
     
     # Set default account_id if not provided
     if account_id is None:
@@ -13,19 +13,55 @@ Responsibilities:
 The categorization and insert logic used to live inline in `cli/import_csv.py`.
 It now lives here so the API can reuse the exact same pipeline.
 """
+import io
 import os
-from typing import Dict, List, Optional, Tuple
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from .categorization_orchestrator import (
-    CategorizationOrchestrator,
-    Transaction,
-    load_rules_from_db,
-)
-from .taxonomy_db import load_taxonomy_from_db
+from psycopg2.extras import execute_values
+
+from budget_automation.utils.pg_copy import copy_field
+from .cache import load_categorization_inputs
+from .categorization_orchestrator import CategorizationOrchestrator, Transaction
 
 
 # Columns written by an import. Kept in one place so the INSERT and the dict
 # builder can't drift apart.
+_INSERT_COLUMNS = (
+    "account_id", "source", "source_row_hash",
+    "txn_date", "post_date",
+    "description_raw", "merchant_raw", "merchant_norm", "merchant_detail",
+    "amount", "currency", "direction", "type", "is_return",
+    "category", "subcategory",
+    "category_source", "category_confidence", "needs_review",
+    "notes", "memo", "created_by",
+)
+
+_INSERT_SQL = (
+    f"INSERT INTO transactions ({', '.join(_INSERT_COLUMNS)}) VALUES %s "
+    "ON CONFLICT (source_row_hash) DO NOTHING RETURNING 1"
+)
+
+# Rows per multi-row INSERT statement (and per commit).
+INSERT_PAGE_SIZE = 500
+
+# Bulk path: COPY into a column-only temp table (no constraints or defaults, so
+# staging never touches the txn_id sequence), then one INSERT ... SELECT.
+_STAGE_SQL = (
+    "CREATE TEMP TABLE transactions_stage ON COMMIT DROP AS "
+    f"SELECT {', '.join(_INSERT_COLUMNS)} FROM transactions WITH NO DATA"
+)
+_COPY_SQL = (
+    f"COPY transactions_stage ({', '.join(_INSERT_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT CSV)"
+)
+_COPY_INSERT_SQL = (
+    f"INSERT INTO transactions ({', '.join(_INSERT_COLUMNS)}) "
+    f"SELECT {', '.join(_INSERT_COLUMNS)} FROM transactions_stage "
+    "ON CONFLICT (source_row_hash) DO NOTHING"
+)
+
+
 def _build_txn_dict(txn: Transaction, orig: Dict) -> Dict:
     """Merge a categorized Transaction with its original parsed row into the
     dict shape the INSERT expects."""
@@ -55,40 +91,48 @@ def _build_txn_dict(txn: Transaction, orig: Dict) -> Dict:
     }
 
 
-def categorize_parsed(
+# Parsed-row fields in Transaction's positional order, either side of amount
+# (which is converted to float). txn_id is always None for new imports.
+_TXN_HEAD_FIELDS = itemgetter("merchant_norm", "merchant_detail", "description_raw")
+_TXN_TAIL_FIELDS = itemgetter(
+    "direction", "txn_date", "post_date", "account_id", "source", "type", "is_return"
+)
+
+# Rows categorized (and, in the CLI, inserted) per step when streaming an import.
+CATEGORIZE_CHUNK_SIZE = 1000
+
+
+def build_orchestrator(
     conn,
-    parsed_txns: List[Dict],
     enable_llm: bool,
     review_threshold: Optional[float] = None,
-) -> Tuple[List[Dict], Dict]:
+) -> CategorizationOrchestrator:
     """
-    Categorize a list of parsed CSV rows (output of parse_chase_csv).
-
-    Args:
-        conn: open DB connection (for rules + taxonomy)
-        parsed_txns: list of parsed row dicts (must include source_row_hash,
-            merchant_raw, currency, memo, plus the normalizer/amount fields)
-        enable_llm: run the LLM fallback on un-ruled merchants
-        review_threshold: confidence floor below which an LLM result is flagged
-            for review (defaults to REVIEW_THRESHOLD env, then 0.80)
+    Build a CategorizationOrchestrator from the DB taxonomy and active rules
+    (served from the on-disk cache when the tables haven't changed).
 
-    Returns:
-        (txn_dicts, stats) where txn_dicts are insert-ready dicts (one per parsed
-        row, same order) and stats is the orchestrator's stats dict.
+    review_threshold defaults to the REVIEW_THRESHOLD env var, then 0.80.
     """
     if review_threshold is None:
         review_threshold = float(os.getenv("REVIEW_THRESHOLD", "0.80"))
 
-    taxonomy = load_taxonomy_from_db(conn)
-    rules = load_rules_from_db(conn)
+    taxonomy, rules = load_categorization_inputs(conn)
 
-    orchestrator = CategorizationOrchestrator(
+    return CategorizationOrchestrator(
         taxonomy=taxonomy,
         rules=rules,
         review_threshold=review_threshold,
         enable_llm=enable_llm,
     )
 
+
+def categorize_rows(
+    orchestrator: CategorizationOrchestrator, parsed_txns: List[Dict]
+) -> List[Dict]:
+    """
+    Categorize parsed CSV rows with an existing orchestrator and return
+    insert-ready dicts. Stats accumulate on orchestrator.stats across calls.
+    """
     # Build Transaction objects, keeping a map from each object's identity to its
     # original parsed row. categorize_batch mutates these same objects in place
     # (it only reorders the list, never copies), so identity pairing is exact and
@@ -96,26 +140,58 @@ def categorize_parsed(
     transactions = []
     orig_by_id: Dict[int, Dict] = {}
     for row in parsed_txns:
+        # Positional construction (field order of Transaction) skips building
+        # a kwargs dict per row.
         txn = Transaction(
-            txn_id=None,
-            merchant_norm=row["merchant_norm"],
-            merchant_detail=row.get("merchant_detail"),
-            description_raw=row["description_raw"],
-            amount=float(row["amount"]),
-            direction=row["direction"],
-            txn_date=row["txn_date"],
-            post_date=row["post_date"],
-            account_id=row["account_id"],
-            source=row["source"],
-            type=row["type"],
-            is_return=row["is_return"],
+            None,
+            *_TXN_HEAD_FIELDS(row),
+            float(row["amount"]),
+            *_TXN_TAIL_FIELDS(row),
         )
         orig_by_id[id(txn)] = row
         transactions.append(txn)
 
     categorized = orchestrator.categorize_batch(transactions)
 
-    txn_dicts = [_build_txn_dict(txn, orig_by_id[id(txn)]) for txn in categorized]
+    return [_build_txn_dict(txn, orig_by_id[id(txn)]) for txn in categorized]
+
+
+def iter_categorized(
+    orchestrator: CategorizationOrchestrator,
+    parsed_txns: List[Dict],
+    chunk_size: int = CATEGORIZE_CHUNK_SIZE,
+) -> Iterator[List[Dict]]:
+    """
+    Yield insert-ready dicts one chunk at a time, so a caller can insert each
+    chunk and drop it instead of holding every categorized row at once.
+    """
+    for start in range(0, len(parsed_txns), chunk_size):
+        yield categorize_rows(orchestrator, parsed_txns[start:start + chunk_size])
+
+
+def categorize_parsed(
+    conn,
+    parsed_txns: List[Dict],
+    enable_llm: bool,
+    review_threshold: Optional[float] = None,
+) -> Tuple[List[Dict], Dict]:
+    """
+    Categorize a list of parsed CSV rows (output of parse_chase_csv).
+
+    Args:
+        conn: open DB connection (for rules + taxonomy)
+        parsed_txns: list of parsed row dicts (must include source_row_hash,
+            merchant_raw, currency, memo, plus the normalizer/amount fields)
+        enable_llm: run the LLM fallback on un-ruled merchants
+        review_threshold: confidence floor below which an LLM result is flagged
+            for review (defaults to REVIEW_THRESHOLD env, then 0.80)
+
+    Returns:
+        (txn_dicts, stats) where txn_dicts are insert-ready dicts (one per parsed
+        row, rule matches first) and stats is the orchestrator's stats dict.
+    """
+    orchestrator = build_orchestrator(conn, enable_llm, review_threshold)
+    txn_dicts = categorize_rows(orchestrator, parsed_txns)
     return txn_dicts, orchestrator.stats
 
 
@@ -173,52 +249,90 @@ def existing_content_keys(conn, account_ids: List[int]) -> Dict[str, int]:
     return counts
 
 
-def insert_transactions(conn, transactions: List[Dict]) -> Tuple[int, int, int]:
+def _copy_transactions(conn, transactions: List[Dict]) -> Tuple[int, int, int]:
+    """
+    Bulk-load transaction dicts with COPY FROM STDIN into a temp staging table,
+    then move them into transactions with a single
+    INSERT ... ON CONFLICT (source_row_hash) DO NOTHING.
+
+    All-or-nothing: any failure rolls back the whole batch and counts every
+    row as an error.
+
+    Returns: (inserted, duplicates, errors)
+    """
+    buf = io.StringIO()
+    for txn in transactions:
+        buf.write(",".join(copy_field(txn[col]) for col in _INSERT_COLUMNS))
+        buf.write("\n")
+    buf.seek(0)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_STAGE_SQL)
+        cursor.copy_expert(_COPY_SQL, buf)
+        cursor.execute(_COPY_INSERT_SQL)
+        inserted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        return 0, 0, len(transactions)
+    finally:
+        cursor.close()
+    return inserted, len(transactions) - inserted, 0
+
+
+def insert_transactions(
+    conn,
+    transactions: List[Dict],
+    page_size: int = INSERT_PAGE_SIZE,
+    bulk: bool = False,
+) -> Tuple[int, int, int]:
     """
     Insert transaction dicts into the DB, deduplicating on the UNIQUE
-    source_row_hash. Commits per row (matches the prior CLI behavior so a single
-    bad row never rolls back a whole import).
+    source_row_hash.
+
+    With bulk=True the rows are loaded through COPY (see _copy_transactions),
+    which is much faster for large back-fills but all-or-nothing.
+
+    Rows go in as multi-row INSERTs of `page_size` rows with
+    ON CONFLICT (source_row_hash) DO NOTHING, committed once per page, so
+    duplicates are detected server-side instead of by parsing exception text.
+    If a page fails for any other reason it is rolled back and retried row by
+    row, so a single bad row still never rolls back a whole import.
 
     Returns: (inserted, duplicates, errors)
     """
+    if bulk:
+        return _copy_transactions(conn, transactions)
+
     cursor = conn.cursor()
     inserted = 0
     duplicates = 0
     errors = 0
 
-    for txn in transactions:
+    for start in range(0, len(transactions), page_size):
+        page = [
+            tuple(txn[col] for col in _INSERT_COLUMNS)
+            for txn in transactions[start:start + page_size]
+        ]
         try:
-            cursor.execute(
-                """
-                INSERT INTO transactions (
-                    account_id, source, source_row_hash,
-                    txn_date, post_date,
-                    description_raw, merchant_raw, merchant_norm, merchant_detail,
-                    amount, currency, direction, type, is_return,
-                    category, subcategory,
-                    category_source, category_confidence, needs_review,
-                    notes, memo, created_by
-                )
-                VALUES (
-                    %(account_id)s, %(source)s, %(source_row_hash)s,
-                    %(txn_date)s, %(post_date)s,
-                    %(description_raw)s, %(merchant_raw)s, %(merchant_norm)s, %(merchant_detail)s,
-                    %(amount)s, %(currency)s, %(direction)s, %(type)s, %(is_return)s,
-                    %(category)s, %(subcategory)s,
-                    %(category_source)s, %(category_confidence)s, %(needs_review)s,
-                    %(notes)s, %(memo)s, %(created_by)s
-                )
-                """,
-                txn,
-            )
+            written = len(execute_values(
+                cursor, _INSERT_SQL, page, page_size=page_size, fetch=True
+            ))
             conn.commit()
-            inserted += 1
-        except Exception as e:
+            inserted += written
+            duplicates += len(page) - written
+        except Exception:
             conn.rollback()
-            msg = str(e).lower()
-            if "duplicate key" in msg or "unique" in msg:
-                duplicates += 1
-            else:
-                errors += 1
+            for row in page:
+                try:
+                    cursor.execute(_INSERT_SQL, (row,))
+                    written = cursor.rowcount
+                    conn.commit()
+                    inserted += written
+                    duplicates += 1 - written
+                except Exception:
+                    conn.rollback()
+                    errors += 1
     cursor.close()
     return inserted, duplicates, errors
@@ -7,14 +7,57 @@ Features:
 - Automatic retry on failures
 - Better JSON parsing with fallback
 - Progress indicators for large batches
+- Concurrent chunk requests (LLM_CONCURRENCY, default 4)
+- Backoff on rate limits via the SDK's retries (LLM_MAX_RETRIES, default 4)
+- Prompt caching for the shared instructions + taxonomy
 """
 import os
 import json
 import time
-import anthropic
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List
 
 
+# Per-request prompts; the shared instructions + taxonomy go in the cached
+# system prompt (LLMCategorizer._build_system_prompt).
+_SINGLE_PROMPT = """TRANSACTION:
+{transaction}
+
+Respond with ONLY a JSON object (no markdown, no explanations):
+{{
+  "category": "Category Name",
+  "subcategory": "Subcategory Name",
+  "confidence": 0.85,
+  "rationale": "Brief 1-sentence explanation"
+}}"""
+
+_BATCH_PROMPT = """Categorize these {count} transactions. Respond with ONLY a JSON array:
+
+TRANSACTIONS:
+{transactions}
+
+Response format (JSON array only, no markdown, no preamble):
+[
+  {{"txn": 1, "category": "...", "subcategory": "...", "confidence": 0.85, "rationale": "..."}},
+  {{"txn": 2, "category": "...", "subcategory": "...", "confidence": 0.90, "rationale": "..."}}
+]
+
+- Include ALL {count} transactions
+- CRITICAL: Return ONLY the JSON array, nothing else"""
+
+
+def _merchant_label(txn: Dict) -> str:
+    """'MERCHANT' or 'MERCHANT (detail)' for a batch prompt line"""
+    if txn.get('merchant_detail'):
+        return f"{txn['merchant_norm']} ({txn['merchant_detail']})"
+    return txn['merchant_norm']
+
+
+def _txn_type(direction: Optional[str]) -> str:
+    """Prompt label for a transaction's direction"""
+    return 'Expense' if direction == 'debit' else 'Income/Credit'
+
+
 class LLMCategorizer:
     """
     Categorizes transactions using Claude API
@@ -31,16 +74,31 @@ class LLMCategorizer:
         # .env change, not a code edit. Default to a current Claude model.
         self.model = os.environ.get('LLM_MODEL', 'claude-sonnet-4-6')
         self.api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
+        # Chunks of a batch sent in parallel; the client is thread-safe and each
+        # chunk is an independent request, so this mostly overlaps network time.
+        self.max_workers = max(1, int(os.environ.get('LLM_CONCURRENCY', '4')))
+        # The SDK retries 429/5xx itself with exponential backoff (honoring
+        # retry-after), so chunks don't need their own pacing.
+        self.max_retries = max(0, int(os.environ.get('LLM_MAX_RETRIES', '4')))
         
         if not self.api_key:
             print("⚠️  Warning: No ANTHROPIC_API_KEY found. LLM categorization disabled.")
             self.enabled = False
         else:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            # Imported here, not at module level: the SDK takes ~1s to import
+            # and every CLI imports this module, including runs that never
+            # call the LLM (--help, rules-only imports, dry runs).
+            import anthropic
+            self.client = anthropic.Anthropic(api_key=self.api_key, max_retries=self.max_retries)
             self.enabled = True
         
         # Build taxonomy string for prompt
         self.taxonomy_str = self._build_taxonomy_string()
+        # category -> its subcategories, for validating suggestions
+        self._valid_subcategories: Dict[str, frozenset] = {
+            cat['name']: frozenset(cat['subcategories']) for cat in self.taxonomy['categories']
+        }
+        self.system = self._build_system_prompt()
     
     def _build_taxonomy_string(self) -> str:
         """Build a concise taxonomy string for the prompt"""
@@ -50,6 +108,26 @@ class LLMCategorizer:
             lines.append(f"- {cat['name']}: {subcats}")
         return '\n'.join(lines)
     
+    def _build_system_prompt(self) -> list:
+        """
+        System prompt shared by every request: instructions + taxonomy.
+        
+        It's identical across calls, so it's marked for prompt caching; only
+        the per-request transaction list is billed in full after the first
+        call (cache entries live ~5 minutes, which covers a whole import).
+        """
+        text = f"""You are a transaction categorization assistant. Given transactions, suggest the most appropriate category and subcategory for each.
+
+TAXONOMY:
+{self.taxonomy_str}
+
+Rules:
+- Choose ONLY from the taxonomy above
+- confidence must be between 0.0 and 1.0
+- If uncertain, use lower confidence
+- rationale should be max 15 words"""
+        return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+    
     def categorize(self,
                    merchant_norm: str,
                    merchant_detail: Optional[str],
@@ -79,36 +157,17 @@ class LLMCategorizer:
             txn_desc += f" ({merchant_detail})"
         txn_desc += f"\nDescription: {description_raw}"
         txn_desc += f"\nAmount: ${abs(amount):.2f}"
-        txn_desc += f"\nType: {'Expense' if direction == 'debit' else 'Income/Credit'}"
+        txn_desc += f"\nType: {_txn_type(direction)}"
         
         # Build prompt
-        prompt = f"""You are a transaction categorization assistant. Given a transaction, suggest the most appropriate category and subcategory.
-
-TAXONOMY:
-{self.taxonomy_str}
-
-TRANSACTION:
-{txn_desc}
-
-Respond with ONLY a JSON object (no markdown, no explanations):
-{{
-  "category": "Category Name",
-  "subcategory": "Subcategory Name",
-  "confidence": 0.85,
-  "rationale": "Brief 1-sentence explanation"
-}}
-
-Rules:
-- Choose ONLY from the taxonomy above
-- confidence must be between 0.0 and 1.0
-- If uncertain, use lower confidence
-- rationale should be max 15 words"""
+        prompt = _SINGLE_PROMPT.format(transaction=txn_desc)
 
         try:
             message = self.client.messages.create(
                 model=self.model,
                 max_tokens=300,
                 temperature=0.0,  # Deterministic
+                system=self.system,
                 messages=[{
                     "role": "user",
                     "content": prompt
@@ -134,10 +193,8 @@ Rules:
             # Validate confidence
             result['confidence'] = max(0.0, min(1.0, float(result['confidence'])))
             
-            # Validate category exists in taxonomy
-            cat_exists = any(c['name'] == result['category'] for c in self.taxonomy['categories'])
-            if not cat_exists:
-                print(f"⚠️  LLM suggested invalid category: {result['category']}")
+            # Validate category/subcategory exist in taxonomy
+            if not self._in_taxonomy(result):
                 return None
             
             return result
@@ -149,6 +206,19 @@ Rules:
             print(f"⚠️  LLM categorization failed: {e}")
             return None
     
+    def _in_taxonomy(self, result: dict) -> bool:
+        """True if the suggested category/subcategory pair exists in the
+        taxonomy; warns and returns False otherwise."""
+        category = result.get('category')
+        subcategories = self._valid_subcategories.get(category) if isinstance(category, str) else None
+        if subcategories is None:
+            print(f"⚠️  LLM suggested invalid category: {category}")
+            return False
+        if result.get('subcategory') not in subcategories:
+            print(f"⚠️  LLM suggested invalid subcategory: {category} / {result.get('subcategory')}")
+            return False
+        return True
+    
     def _categorize_chunk(self, transactions: list, chunk_num: int = 0, retry: int = 0) -> list:
         """
         Categorize a chunk of transactions
@@ -165,41 +235,20 @@ Rules:
             return [None] * len(transactions)
         
         # Build batch prompt
-        txn_list = []
-        for i, txn in enumerate(transactions):
-            merchant = txn['merchant_norm']
-            if txn.get('merchant_detail'):
-                merchant += f" ({txn['merchant_detail']})"
-            
-            txn_str = f"{i+1}. {merchant} - ${abs(txn['amount']):.2f}"
-            txn_list.append(txn_str)
-        
-        prompt = f"""Categorize these {len(transactions)} transactions. Respond with ONLY a JSON array:
-
-TAXONOMY:
-{self.taxonomy_str}
-
-TRANSACTIONS:
-{chr(10).join(txn_list)}
-
-Response format (JSON array only, no markdown, no preamble):
-[
-  {{"txn": 1, "category": "...", "subcategory": "...", "confidence": 0.85, "rationale": "..."}},
-  {{"txn": 2, "category": "...", "subcategory": "...", "confidence": 0.90, "rationale": "..."}}
-]
-
-Rules:
-- Choose ONLY from taxonomy above
-- Include ALL {len(transactions)} transactions
-- confidence 0.0-1.0
-- rationale max 15 words
-- CRITICAL: Return ONLY the JSON array, nothing else"""
+        prompt = _BATCH_PROMPT.format(
+            count=len(transactions),
+            transactions='\n'.join(
+                f"{i}. {_merchant_label(txn)} - ${abs(txn['amount']):.2f} ({_txn_type(txn.get('direction'))})"
+                for i, txn in enumerate(transactions, 1)
+            ),
+        )
 
         try:
             message = self.client.messages.create(
                 model=self.model,
                 max_tokens=4000,  # Larger for batch responses
                 temperature=0.0,
+                system=self.system,
                 messages=[{
                     "role": "user",
                     "content": prompt
@@ -208,20 +257,8 @@ Rules:
             
             response_text = message.content[0].text.strip()
             
-            # Remove markdown code blocks
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                # Find first [ and last ]
-                for i, line in enumerate(lines):
-                    if '[' in line:
-                        response_text = '\n'.join(lines[i:])
-                        break
-                for i in range(len(lines) - 1, -1, -1):
-                    if ']' in lines[i]:
-                        response_text = '\n'.join(response_text.split('\n')[:i+1])
-                        break
-            
-            # Extract JSON array (handle cases where there's text before/after)
+            # Extract JSON array (handles markdown fences and any text
+            # before/after)
             start_idx = response_text.find('[')
             end_idx = response_text.rfind(']')
             
@@ -244,7 +281,11 @@ Rules:
                 while len(results) < len(transactions):
                     results.append(None)
             
-            return results
+            # Same taxonomy check as categorize(): drop invalid pairs
+            return [
+                r if isinstance(r, dict) and self._in_taxonomy(r) else None
+                for r in results
+            ]
             
         except json.JSONDecodeError as e:
             print(f"⚠️  Chunk {chunk_num} JSON parse error: {e}")
@@ -281,13 +322,15 @@ Rules:
             
             return [None] * len(transactions)
     
-    def categorize_batch(self, transactions: list, chunk_size: int = 50) -> list:
+    def categorize_batch(self, transactions: list, chunk_size: int = 50,
+                         max_workers: Optional[int] = None) -> list:
         """
         Categorize multiple transactions in batches
         
         Args:
             transactions: List of transaction dicts
             chunk_size: Number of transactions per batch (default 50)
+            max_workers: Batches in flight at once (default self.max_workers)
             
         Returns:
             List of categorization results (same order as input)
@@ -298,17 +341,29 @@ Rules:
         if not transactions:
             return []
         
-        # Process in chunks
-        results = []
-        total_chunks = (len(transactions) + chunk_size - 1) // chunk_size
+        chunks = [transactions[i:i + chunk_size] for i in range(0, len(transactions), chunk_size)]
+        total_chunks = len(chunks)
+        workers = min(max_workers or self.max_workers, total_chunks)
         
         if total_chunks > 1:
             print(f"   📦 Processing {len(transactions)} transactions in {total_chunks} batches...")
         
-        for i in range(0, len(transactions), chunk_size):
-            chunk = transactions[i:i + chunk_size]
-            chunk_num = i // chunk_size + 1
+        if workers > 1:
+            def run_chunk(chunk_num):
+                chunk = chunks[chunk_num - 1]
+                chunk_results = self._categorize_chunk(chunk, chunk_num)
+                success_count = sum(1 for r in chunk_results if r is not None)
+                print(f"   ✅ Batch {chunk_num}/{total_chunks}: {success_count}/{len(chunk)} categorized")
+                return chunk_results
             
+            # map() yields in submission order, so results line up with input
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return [r for chunk_results in executor.map(run_chunk, range(1, total_chunks + 1))
+                        for r in chunk_results]
+        
+        # Process in chunks
+        results = []
+        for chunk_num, chunk in enumerate(chunks, 1):
             if total_chunks > 1:
                 print(f"   🔄 Batch {chunk_num}/{total_chunks} ({len(chunk)} transactions)...", end='', flush=True)
             
@@ -318,10 +373,6 @@ Rules:
             if total_chunks > 1:
                 success_count = sum(1 for r in chunk_results if r is not None)
                 print(f" ✅ {success_count}/{len(chunk)} categorized")
-            
-            # Rate limiting: small delay between chunks
-            if i + chunk_size < len(transactions):
-                time.sleep(0.5)
         
         return results
 
@@ -5,6 +5,7 @@ Converts raw bank descriptions into clean, normalized merchant names
 for consistent rule matching and analytics.
 """
 import re
+from functools import lru_cache
 from typing import Tuple, Optional
 
 # Common noise patterns to strip
@@ -93,9 +94,115 @@ ACH_ORIG_PATTERN = re.compile(
 # Suffixes to strip from an extracted ACH originator name.
 _COMPANY_SUFFIXES = (' INC', ' LLC', ' LTD', ' CORP', ' CO')
 
+# Suffixes stripped, in this order, from the cleaned-up merchant name.
+_TRAILING_SUFFIXES = (' INC', ' LLC', ' LTD', ' CO', ' CORP')
+
+# POS systems whose descriptions carry the real merchant after the prefix.
+POS_PATTERNS = {
+    r'SQ\s*\*\s*(.+)': 'SQ',
+    r'TST\s*\*\s*(.+)': 'TST',
+    r'SP\s+(.+)': 'SP',
+}
+
+
+def _combine(patterns):
+    """
+    Compile a {pattern: replacement} table into one alternation of named
+    groups, tried in table order.
+
+    Returns (regex, {group number: table index}); the caller re-runs the
+    single entry that matched to read its captures.
+    """
+    combined = re.compile('|'.join(f'(?P<_{i}>{p})' for i, p in enumerate(patterns)))
+    return combined, {combined.groupindex[f'_{i}']: i for i in range(len(patterns))}
+
+
+def _first_search(text, combined, index, table):
+    """
+    First (match, replacement) in table order whose pattern is found in text,
+    or (None, None).
+
+    combined.search() finds the leftmost hit of any entry, but an entry listed
+    earlier that matches further right still wins, so settle it among the
+    entries up to and including the one that hit. Misses cost a single scan.
+    """
+    hit = combined.search(text)
+    if hit:
+        for pattern, replacement in table[:index[hit.lastindex] + 1]:
+            match = pattern.search(text)
+            if match:
+                return match, replacement
+    return None, None
+
+
+_LEADING_LITERAL_RE = re.compile(r'\^?([A-Z0-9 ]+)(?![?*+{])')
+
+
+def _leading_literals(patterns):
+    """
+    The literal text each pattern starts with, for a cheap str pre-screen
+    before running the regexes. None if any pattern has no usable leading
+    literal (or a top-level alternation), in which case don't pre-screen.
+    """
+    literals = []
+    for pattern in patterns:
+        match = _LEADING_LITERAL_RE.match(pattern)
+        if not match or '|' in pattern:
+            return None
+        literals.append(match.group(1))
+    return tuple(dict.fromkeys(literals))
+
+
+# Compiled once at import; normalize_merchant runs for every CSV row.
+_POS_RES = [(re.compile(p), r) for p, r in POS_PATTERNS.items()]
+_POS_RE, _POS_INDEX = _combine(POS_PATTERNS)
+_INTERNAL_RES = [(re.compile(p), r) for p, r in INTERNAL_PATTERNS.items()]
+_INTERNAL_RE, _INTERNAL_INDEX = _combine(INTERNAL_PATTERNS)
+# Internal patterns are anchored, so a description can only match one if it
+# starts with that pattern's literal ("CHASE", "ZELLE PAYMENT TO", ...).
+_INTERNAL_PREFIXES = _leading_literals(INTERNAL_PATTERNS) or ('',)
+_NOISE_RES = [re.compile(p) for p in NOISE_PATTERNS]
+# Any-noise probe: one scan answers "is there anything to strip at all?".
+# The passes themselves stay sequential, since one alternation is not
+# equivalent -- e.g. "PPD ID: 5264681992" loses its digits to the long-ID
+# pass first and keeps "PPD ID:", which existing merchant_norm values (and
+# the rules keyed on them) depend on.
+_NOISE_ANY_RE = re.compile('|'.join(f'(?:{p})' for p in NOISE_PATTERNS))
+_ALIAS_RES = [(re.compile(p), r) for p, r in MERCHANT_ALIASES.items()]
+_ALIAS_RE, _ALIAS_INDEX = _combine(MERCHANT_ALIASES)
+# Result for descriptions that leave nothing usable behind.
+_UNKNOWN = ("UNKNOWN", None)
+
+# Shared (name, None) results for the table hits, so those returns don't
+# build a new tuple each time.
+_CANONICAL_RESULTS = {
+    name: (name, None)
+    for name in (*INTERNAL_PATTERNS.values(), *MERCHANT_ALIASES.values())
+}
+_TRAILING_STORE_NUM_RE = re.compile(r'\s+#\s*\d+$')
+
+
+def _strip_trailing_id(text: str) -> str:
+    r"""
+    Drop a trailing whitespace-separated run of 10+ digits (a reference
+    number) from already-stripped text: re.sub(r'\s+\d{10,}$', '', text)
+    without the regex engine, since most inputs have nothing to strip.
+    """
+    i = len(text)
+    while i and text[i - 1].isdecimal():
+        i -= 1
+    if len(text) - i >= 10 and i and text[i - 1].isspace():
+        return text[:i].rstrip()
+    return text
+
+
+@lru_cache(maxsize=8192)
 def normalize_merchant(raw_description: str) -> Tuple[str, Optional[str]]:
     """
     Normalize a raw bank description into a clean merchant name.
+
+    Memoized on the raw description: recurring charges repeat the same text
+    across statements, and the result is an immutable tuple.
     
     Args:
         raw_description: Raw description from bank CSV
@@ -106,25 +213,21 @@ def normalize_merchant(raw_description: str) -> Tuple[str, Optional[str]]:
         - merchant_detail: Additional detail (e.g., specific SQ merchant, Zelle payee)
     """
     if not raw_description:
-        return "UNKNOWN", None
+        return _UNKNOWN
     
     # Start with uppercase and strip
     text = raw_description.upper().strip()
     merchant_detail = None
     
     # Step 1: Check for POS systems FIRST (before noise removal strips asterisks)
-    pos_patterns = {
-        r'SQ\s*\*\s*(.+)': 'SQ',
-        r'TST\s*\*\s*(.+)': 'TST', 
-        r'SP\s+(.+)': 'SP',
-    }
-    for pattern, replacement in pos_patterns.items():
-        match = re.search(pattern, text)
+    # SQ/TST need a '*' and SP needs "SP"; skip the searches when neither is there.
+    if '*' in text or 'SP' in text:
+        match, replacement = _first_search(text, _POS_RE, _POS_INDEX, _POS_RES)
         if match and match.groups():
             merchant_detail = match.group(1).strip()
             # Clean up the merchant detail (remove trailing numbers/noise)
-            merchant_detail = re.sub(r'\s+\d{10,}$', '', merchant_detail).strip()
-            merchant_detail = re.sub(r'\s+', ' ', merchant_detail).strip()
+            merchant_detail = _strip_trailing_id(merchant_detail)
+            merchant_detail = ' '.join(merchant_detail.split())
             return replacement, merchant_detail
     
     # Step 1b: Chase ACH-detail format ("ORIG CO NAME:... CO ENTRY DESCR:...").
@@ -132,7 +235,7 @@ def normalize_merchant(raw_description: str) -> Tuple[str, Optional[str]]:
     # so pull it out here. For Venmo, the entry description distinguishes a
     # cashout (credit landing in the bank) from an outgoing payment — both must
     # normalize to the canonical names so Venmo enrichment can match them.
-    ach = ACH_ORIG_PATTERN.search(text)
+    ach = ACH_ORIG_PATTERN.search(text) if 'ORIG CO NAME:' in text else None
     if ach:
         originator = ach.group("name").strip()
         entry_descr = ach.group("descr").strip()
@@ -152,49 +255,56 @@ def normalize_merchant(raw_description: str) -> Tuple[str, Optional[str]]:
             return merchant, None
 
     # Step 2: Check for internal transaction patterns
-    for pattern, replacement in INTERNAL_PATTERNS.items():
-        match = re.match(pattern, text)
-        if match:
-            # Special handling for Zelle (extract payee/payer)
-            if 'ZELLE' in replacement:
-                if match.groups():
-                    payee = match.group(1).strip()
-                    # Remove trailing numeric IDs
-                    payee = re.sub(r'\s+\d{10,}$', '', payee).strip()
-                    return replacement, payee
-            return replacement, None
+    # All internal patterns are anchored, so the alternation tries them in
+    # table order at position 0 -- the alternative that matched is the answer.
+    match = text.startswith(_INTERNAL_PREFIXES) and _INTERNAL_RE.match(text)
+    if match:
+        pattern, replacement = _INTERNAL_RES[_INTERNAL_INDEX[match.lastindex]]
+        match = pattern.match(text)
+        # Special handling for Zelle (extract payee/payer)
+        if 'ZELLE' in replacement:
+            if match.groups():
+                payee = match.group(1).strip()
+                # Remove trailing numeric IDs
+                payee = _strip_trailing_id(payee)
+                return replacement, payee
+        return _CANONICAL_RESULTS[replacement]
     
     # Step 3: Strip noise patterns
-    for pattern in NOISE_PATTERNS:
-        text = re.sub(pattern, '', text)
+    if _NOISE_ANY_RE.search(text):
+        for pattern in _NOISE_RES:
+            text = pattern.sub('', text)
     
     # Step 4: Apply merchant aliases
-    for pattern, replacement in MERCHANT_ALIASES.items():
-        match = re.search(pattern, text)
-        if match:
-            # Special handling for POS systems (extract merchant name)
-            if replacement in ['SQ', 'TST', 'SP'] and match.groups():
-                merchant_detail = match.group(1).strip()
-                # Clean up the merchant detail
-                merchant_detail = re.sub(r'\s+', ' ', merchant_detail).strip()
+    match, replacement = _first_search(text, _ALIAS_RE, _ALIAS_INDEX, _ALIAS_RES)
+    if match:
+        # Special handling for POS systems (extract merchant name)
+        if replacement in ['SQ', 'TST', 'SP'] and match.groups():
+            merchant_detail = match.group(1).strip()
+            # Clean up the merchant detail
+            merchant_detail = ' '.join(merchant_detail.split())
             return replacement, merchant_detail
+        return _CANONICAL_RESULTS[replacement]
     
     # Step 5: General cleanup
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = ' '.join(text.split())
     
     # Remove trailing location codes (e.g., "STORE #123" -> "STORE")
-    text = re.sub(r'\s+#\s*\d+$', '', text)
+    text = _TRAILING_STORE_NUM_RE.sub('', text)
     
     # Remove common suffixes
-    suffixes = [' INC', ' LLC', ' LTD', ' CO', ' CORP']
-    for suffix in suffixes:
-        if text.endswith(suffix):
-            text = text[:-len(suffix)].strip()
+    # One endswith(tuple) call for the common no-suffix case; the loop runs
+    # the suffixes in order, so "ACME CO INC" -> "ACME" but "ACME INC CO"
+    # -> "ACME INC", as before.
+    if text.endswith(_TRAILING_SUFFIXES):
+        for suffix in _TRAILING_SUFFIXES:
+            if text.endswith(suffix):
+                text = text[:-len(suffix)].strip()
     
     # Step 6: Validate result
-    if not text or len(text) < 2:
-        return "UNKNOWN", None
+    if len(text) < 2:
+        return _UNKNOWN
     
     return text, merchant_detail
 
@@ -212,9 +322,13 @@ def extract_merchant_from_checking(description: str) -> Tuple[str, Optional[str]
     """
     return normalize_merchant(description)
 
-def test_normalization():
-    """Test cases for merchant normalization"""
-    test_cases = [
+def _normalization_cases():
+    """
+    (raw description, expected merchant_norm, expected merchant_detail)
+    examples. Built on demand for test_normalization() and the pytest suite
+    rather than kept as module data.
+    """
+    return [
         # Amazon
         ("AMZN Mktp US*UE1F70L13", "AMAZON", None),
         ("Amazon.com*4309A8OT3", "AMAZON", None),
@@ -260,6 +374,10 @@ def test_normalization():
         ("ORIG CO NAME:LIPA CO ENTRY DESCR:ONLINE PAY SEC:WEB IND ID:0583802735 ORIG ID:1563585001", "LIPA", None),
         ("ORIG CO NAME:OLLIE PETS INC CO ENTRY DESCR:G76KGZU75A SEC:PPD ORIG ID:9186939000", "OLLIE PETS", None),
     ]
+
+def test_normalization():
+    """Test cases for merchant normalization"""
+    test_cases = _normalization_cases()
     
     print("Testing merchant normalization...")
     print("=" * 80)
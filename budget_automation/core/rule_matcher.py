@@ -8,10 +8,34 @@ Matches transactions against merchant rules with support for:
 - Priority-based rule selection
 """
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 
+@lru_cache(maxsize=None)
+def _compile_rule_regex(pattern: str) -> Optional[re.Pattern]:
+    """
+    Compile a regex rule's pattern once per process, keyed on the pattern text
+    (shared by every RuleMatcher/orchestrator built in the process).
+
+    Returns None for an invalid pattern so the failure is cached too.
+    """
+    try:
+        return re.compile(pattern)
+    except re.error:
+        return None
+
+
+def _detail_matches_upper(rule_detail: Optional[str], detail: Optional[str]) -> bool:
+    """RuleMatcher._detail_matches on already-uppercased strings"""
+    if not rule_detail:
+        return True
+    if not detail:
+        return False
+    return rule_detail in detail or detail in rule_detail
+
+
 @dataclass
 class CategorizationResult:
     """Result of categorization attempt"""
@@ -31,6 +55,13 @@ class RuleMatcher:
     
     def __init__(self):
         self.rules = []
+        # Built by load_rules: exact rules keyed on match_value, every other
+        # rule in a list to scan. Both hold (position in self.rules, rule).
+        self._exact_index = {}
+        self._scan_rules = []
+        # (merchant_norm, merchant_detail) -> matched rule or None; merchants
+        # repeat heavily across a batch, so most lookups end here
+        self._match_cache = {}
         self.stats = {
             'matches': 0,
             'no_match': 0,
@@ -58,6 +89,28 @@ class RuleMatcher:
         self.rules = [r for r in rules if r.get('is_active', True)]
         self.rules.sort(key=lambda x: (x['priority'], x['rule_id']))
         
+        # Rule values are uppercased here once, so a lookup only has to
+        # uppercase the transaction's own strings
+        self._exact_index = {}
+        self._scan_rules = []
+        self._match_cache = {}
+        for position, rule in enumerate(self.rules):
+            match_type = rule['match_type']
+            value = rule['match_value'].upper()
+            rule_detail = rule['match_detail'].upper() if rule.get('match_detail') else None
+            if match_type == 'exact':
+                self._exact_index.setdefault(value, []).append((position, rule, rule_detail))
+            elif match_type == 'regex':
+                # Compile up front; a bad pattern is reported once here
+                # instead of on every transaction, and can never match
+                value = _compile_rule_regex(value)
+                if value is None:
+                    print(f"⚠️  Invalid regex in rule {rule.get('rule_id')}: {rule['match_value']}")
+                    continue
+                self._scan_rules.append((position, rule, match_type, value, rule_detail))
+            elif match_type in ('contains', 'startswith'):
+                self._scan_rules.append((position, rule, match_type, value, rule_detail))
+        
         print(f"✅ Loaded {len(self.rules)} active rules")
     
     def match_rule(self, rule: Dict, merchant_norm: str, merchant_detail: Optional[str]) -> bool:
@@ -86,16 +139,22 @@ class RuleMatcher:
         elif match_type == 'startswith':
             norm_matches = merchant_norm.startswith(match_value)
         elif match_type == 'regex':
-            try:
-                norm_matches = bool(re.search(match_value, merchant_norm))
-            except re.error:
+            pattern = _compile_rule_regex(match_value)
+            if pattern is None:
                 print(f"⚠️  Invalid regex in rule {rule.get('rule_id')}: {match_value}")
                 norm_matches = False
+            else:
+                norm_matches = bool(pattern.search(merchant_norm))
         
         if not norm_matches:
             return False
         
         # Second: If rule has match_detail, check merchant_detail
+        return self._detail_matches(rule, merchant_detail)
+    
+    @staticmethod
+    def _detail_matches(rule: Dict, merchant_detail: Optional[str]) -> bool:
+        """Check a rule's (optional) match_detail against merchant_detail"""
         if rule.get('match_detail'):
             if not merchant_detail:
                 return False  # Rule requires detail but transaction has none
@@ -109,6 +168,47 @@ class RuleMatcher:
         # No detail requirement, norm match is sufficient
         return True
     
+    def find_rule(self, merchant_norm: str, merchant_detail: Optional[str]) -> Optional[Dict]:
+        """
+        Return the first matching rule in (priority, rule_id) order, or None.
+        
+        Exact rules are looked up by merchant_norm instead of scanned; the
+        scan over the remaining rule types stops once it passes the best
+        exact match. Results are memoized per (merchant_norm, merchant_detail)
+        until the next load_rules.
+        """
+        key = (merchant_norm, merchant_detail)
+        try:
+            return self._match_cache[key]
+        except KeyError:
+            pass
+        rule = self._match_cache[key] = self._find_rule(merchant_norm, merchant_detail)
+        return rule
+    
+    def _find_rule(self, merchant_norm: str, merchant_detail: Optional[str]) -> Optional[Dict]:
+        norm = merchant_norm.upper()
+        detail = merchant_detail.upper() if merchant_detail else None
+        
+        best_position, best_rule = len(self.rules), None
+        for position, rule, rule_detail in self._exact_index.get(norm, ()):
+            if _detail_matches_upper(rule_detail, detail):
+                best_position, best_rule = position, rule
+                break
+        
+        for position, rule, match_type, value, rule_detail in self._scan_rules:
+            if position >= best_position:
+                break
+            if match_type == 'contains':
+                hit = value in norm
+            elif match_type == 'startswith':
+                hit = norm.startswith(value)
+            else:
+                hit = value.search(norm) is not None
+            if hit and _detail_matches_upper(rule_detail, detail):
+                return rule
+        
+        return best_rule
+    
     def categorize(self, 
                    merchant_norm: str, 
                    merchant_detail: Optional[str] = None,
@@ -125,26 +225,26 @@ class RuleMatcher:
             CategorizationResult with category info or None
         """
         # Try to find a matching rule
-        for rule in self.rules:
-            if self.match_rule(rule, merchant_norm, merchant_detail):
-                self.stats['matches'] += 1
-                self.stats['by_rule_type'][rule.get('rule_pack', 'unknown')] = \
-                    self.stats['by_rule_type'].get(rule.get('rule_pack', 'unknown'), 0) + 1
-                
-                # Build rationale
-                rationale = f"Matched rule {rule['rule_id']}"
-                if merchant_detail:
-                    rationale += f" (detail: {merchant_detail})"
-                
-                return CategorizationResult(
-                    category=rule['category'],
-                    subcategory=rule['subcategory'],
-                    category_source='rule',
-                    category_confidence=1.0,  # Rules are 100% confident
-                    needs_review=False,
-                    matched_rule_id=rule['rule_id'],
-                    rationale=rationale,
-                )
+        rule = self.find_rule(merchant_norm, merchant_detail)
+        if rule is not None:
+            self.stats['matches'] += 1
+            self.stats['by_rule_type'][rule.get('rule_pack', 'unknown')] = \
+                self.stats['by_rule_type'].get(rule.get('rule_pack', 'unknown'), 0) + 1
+            
+            # Build rationale
+            rationale = f"Matched rule {rule['rule_id']}"
+            if merchant_detail:
+                rationale += f" (detail: {merchant_detail})"
+            
+            return CategorizationResult(
+                category=rule['category'],
+                subcategory=rule['subcategory'],
+                category_source='rule',
+                category_confidence=1.0,  # Rules are 100% confident
+                needs_review=False,
+                matched_rule_id=rule['rule_id'],
+                rationale=rationale,
+            )
         
         # No rule matched
         self.stats['no_match'] += 1
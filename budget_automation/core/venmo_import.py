@@ -10,9 +10,51 @@ from pathlib import Path
 from datetime import datetime
 import hashlib
 
+from psycopg2.extras import execute_values
+
 from budget_automation.utils.db_connection import get_db_connection
 
 
+# Columns written to venmo_transactions_raw (import_batch_id is appended per
+# batch). Shared by the API staging path and the CLI so they can't drift.
+_STAGING_COLUMNS = (
+    'venmo_id', 'transaction_datetime', 'transaction_date',
+    'transaction_type', 'amount', 'direction', 'from_name', 'to_name',
+    'note', 'account_owner', 'funding_source', 'destination',
+)
+
+# One array parameter, so the statement text is the same for every batch size
+# and Postgres can reuse its plan (a dynamic IN (%s, %s, ...) list could not).
+_EXISTING_IDS_SQL = "SELECT venmo_id FROM venmo_transactions_raw WHERE venmo_id = ANY(%s::text[])"
+
+
+def _insert_staging_rows(cursor, txns, batch_id):
+    """
+    Insert parsed Venmo rows into venmo_transactions_raw with multi-row
+    INSERTs (one statement per 500 rows rather than one per row).
+
+    Returns the transaction_type of each row actually inserted.
+    """
+    rows = [
+        tuple(t.get(col) for col in _STAGING_COLUMNS) + (batch_id,)
+        for t in txns
+    ]
+    inserted = execute_values(
+        cursor,
+        f"""
+        INSERT INTO venmo_transactions_raw (
+            {', '.join(_STAGING_COLUMNS)}, import_batch_id
+        ) VALUES %s
+        ON CONFLICT (venmo_id) DO NOTHING
+        RETURNING transaction_type
+        """,
+        rows,
+        page_size=500,
+        fetch=True,
+    )
+    return [row[0] for row in inserted]
+
+
 def parse_venmo_amount(amount_str):
     """Parse Venmo amount string (e.g., '+ $100.00' or '- $50.00')"""
     amount_str = amount_str.strip()
@@ -155,43 +197,24 @@ def stage_venmo_transactions(conn, csv_path):
     batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
 
     venmo_ids = [t['venmo_id'] for t in txns]
-    placeholders = ','.join(['%s'] * len(venmo_ids))
-    cursor.execute(
-        f"SELECT venmo_id FROM venmo_transactions_raw WHERE venmo_id IN ({placeholders})",
-        venmo_ids,
-    )
+    cursor.execute(_EXISTING_IDS_SQL, (venmo_ids,))
     existing = set(row[0] for row in cursor.fetchall())
     new_txns = [t for t in txns if t['venmo_id'] not in existing]
 
-    insert_query = """
-        INSERT INTO venmo_transactions_raw (
-            venmo_id, transaction_datetime, transaction_date,
-            transaction_type, amount, direction, from_name, to_name,
-            note, account_owner, funding_source, destination, import_batch_id
-        ) VALUES (
-            %(venmo_id)s, %(transaction_datetime)s, %(transaction_date)s,
-            %(transaction_type)s, %(amount)s, %(direction)s,
-            %(from_name)s, %(to_name)s, %(note)s, %(account_owner)s,
-            %(funding_source)s, %(destination)s, %(batch_id)s
-        )
-        ON CONFLICT (venmo_id) DO NOTHING
-    """
-
     by_type = {}
-    inserted = 0
     try:
-        for t in new_txns:
-            t['batch_id'] = batch_id
-            cursor.execute(insert_query, t)
-            inserted += 1
-            ttype = t.get('transaction_type') or 'Other'
-            by_type[ttype] = by_type.get(ttype, 0) + 1
+        inserted_types = _insert_staging_rows(cursor, new_txns, batch_id)
         conn.commit()
     except Exception:
         conn.rollback()
         cursor.close()
         raise
 
+    for ttype in inserted_types:
+        ttype = ttype or 'Other'
+        by_type[ttype] = by_type.get(ttype, 0) + 1
+    inserted = len(inserted_types)
+
     cursor.close()
     return {
         'parsed': parsed,
@@ -248,14 +271,7 @@ def import_venmo_transactions(*csv_paths, dry_run=False):
     print("\n🔍 Checking for existing transactions...")
     venmo_ids = [t['venmo_id'] for t in all_transactions]
     
-    placeholders = ','.join(['%s'] * len(venmo_ids))
-    check_query = f"""
-        SELECT venmo_id
-        FROM venmo_transactions_raw
-        WHERE venmo_id IN ({placeholders})
-    """
-    
-    cursor.execute(check_query, venmo_ids)
+    cursor.execute(_EXISTING_IDS_SQL, (venmo_ids,))
     existing_ids = set(row[0] for row in cursor.fetchall())
     
     print(f"✅ Found {len(existing_ids)} existing transactions")
@@ -308,25 +324,7 @@ def import_venmo_transactions(*csv_paths, dry_run=False):
         
         print(f"\n📥 Importing {len(new_transactions)} transactions...")
         
-        insert_query = """
-            INSERT INTO venmo_transactions_raw (
-                venmo_id, transaction_datetime, transaction_date,
-                transaction_type, amount, direction, from_name, to_name,
-                note, account_owner, import_batch_id
-            ) VALUES (
-                %(venmo_id)s, %(transaction_datetime)s, %(transaction_date)s,
-                %(transaction_type)s, %(amount)s, %(direction)s, 
-                %(from_name)s, %(to_name)s, %(note)s, %(account_owner)s,
-                %(batch_id)s
-            )
-        """
-        
-        inserted = 0
-        for txn in new_transactions:
-            txn['batch_id'] = batch_id
-            cursor.execute(insert_query, txn)
-            inserted += 1
-        
+        inserted = len(_insert_staging_rows(cursor, new_transactions, batch_id))
         conn.commit()
         
         print(f"✅ Imported {inserted} transactions")
@@ -265,6 +265,26 @@ CREATE SEQUENCE public.merchant_rules_rule_id_seq
 ALTER SEQUENCE public.merchant_rules_rule_id_seq OWNED BY public.merchant_rules.rule_id;
 
 
+--
+-- Name: product_category_cache; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.product_category_cache (
+    asin character varying(20) NOT NULL,
+    product_name text,
+    category character varying(100) NOT NULL,
+    subcategory character varying(100) NOT NULL,
+    created_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: TABLE product_category_cache; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON TABLE public.product_category_cache IS 'LLM (category, subcategory) per Amazon ASIN, reused across enrichment runs.';
+
+
 --
 -- Name: tag_events; Type: TABLE; Schema: public; Owner: -
 --
@@ -656,6 +676,14 @@ ALTER TABLE ONLY public.merchant_rules
     ADD CONSTRAINT merchant_rules_pkey PRIMARY KEY (rule_id);
 
 
+--
+-- Name: product_category_cache product_category_cache_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.product_category_cache
+    ADD CONSTRAINT product_category_cache_pkey PRIMARY KEY (asin);
+
+
 --
 -- Name: tag_events tag_events_pkey; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -748,6 +776,13 @@ CREATE INDEX idx_amazon_import_date ON public.amazon_orders_raw USING btree (imp
 CREATE INDEX idx_amazon_order_date ON public.amazon_orders_raw USING btree (order_date);
 
 
+--
+-- Name: idx_amazon_unenriched_order_date; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_amazon_unenriched_order_date ON public.amazon_orders_raw USING btree (order_date) WHERE (enriched = false);
+
+
 --
 -- Name: idx_merchant_rules_active; Type: INDEX; Schema: public; Owner: -
 --
@@ -818,6 +853,13 @@ CREATE INDEX idx_taxonomy_subcategories_category ON public.taxonomy_subcategorie
 CREATE INDEX idx_transactions_account ON public.transactions USING btree (account_id);
 
 
+--
+-- Name: idx_transactions_amazon_match; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_transactions_amazon_match ON public.transactions USING btree (txn_date, amount) WHERE ((merchant_norm)::text = 'AMAZON'::text);
+
+
 --
 -- Name: idx_transactions_category; Type: INDEX; Schema: public; Owner: -
 --
@@ -0,0 +1,19 @@
+-- Indexes for Amazon enrichment.
+--
+-- find_matching_transactions joins every unenriched order against AMAZON card
+-- charges by date window and amount; the partial index keeps that a small range
+-- scan over just the Amazon rows. get_unenriched_orders filters on
+-- enriched = FALSE and orders by order_date, which the second index covers.
+--
+-- CONCURRENTLY avoids locking writes on a live database, so run this file
+-- outside a transaction block:
+--   psql -U budget_user -d budget_db -f migrations/003_amazon_match_indexes.sql
+-- Then confirm the planner uses them with EXPLAIN ANALYZE on the match query.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_amazon_match
+    ON transactions (txn_date, amount)
+    WHERE merchant_norm = 'AMAZON';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_amazon_unenriched_order_date
+    ON amazon_orders_raw (order_date)
+    WHERE enriched = FALSE;
@@ -0,0 +1,18 @@
+-- Durable cache of LLM categorizations for Amazon products, keyed by ASIN.
+--
+-- Amazon enrichment loads this once per run and only sends products it has
+-- never seen to the LLM, writing the new answers back at the end. Rows whose
+-- (category, subcategory) is no longer in the taxonomy are ignored on load.
+--
+-- Run with: psql -U budget_user -d budget_db -f migrations/004_product_category_cache.sql
+
+CREATE TABLE IF NOT EXISTS product_category_cache (
+    asin VARCHAR(20) PRIMARY KEY,
+    product_name TEXT,
+    category VARCHAR(100) NOT NULL,
+    subcategory VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE product_category_cache IS
+    'LLM (category, subcategory) per Amazon ASIN, reused across enrichment runs.';
@@ -152,43 +152,44 @@ def render_review_queue():
     """Main review queue interface"""
     st.header("📋 Transaction Review Queue")
     
-    # Load data
+    # Load data. The connection comes from the shared pool, and st.rerun()
+    # (called from the review widgets) raises, so return it in a finally.
     conn = get_db_connection()
-    taxonomy = load_taxonomy()
-    df = get_review_queue(conn)
+    try:
+        taxonomy = load_taxonomy()
+        df = get_review_queue(conn)
+    
+        if df.empty:
+            st.success("🎉 All transactions reviewed! Nothing needs your attention.")
+            return
+    
+        # Summary stats
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Transactions to Review", len(df))
+        with col2:
+            total_amount = df[df['direction'] == 'debit']['amount'].sum()
+            st.metric("Total Expenses", f"${total_amount:,.2f}")
+        with col3:
+            avg_confidence = df['category_confidence'].mean() * 100
+            st.metric("Avg Confidence", f"{avg_confidence:.0f}%")
+    
+        st.markdown("---")
+    
+        # Review mode selection
+        review_mode = st.radio(
+            "Review Mode:",
+            ["One at a Time", "Bulk Review"],
+            horizontal=True,
+            key="review_mode"
+        )
     
-    if df.empty:
-        st.success("🎉 All transactions reviewed! Nothing needs your attention.")
+        if review_mode == "One at a Time":
+            render_single_review(df, taxonomy, conn)
+        else:
+            render_bulk_review(df, taxonomy, conn)
+    finally:
         conn.close()
-        return
-    
-    # Summary stats
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Transactions to Review", len(df))
-    with col2:
-        total_amount = df[df['direction'] == 'debit']['amount'].sum()
-        st.metric("Total Expenses", f"${total_amount:,.2f}")
-    with col3:
-        avg_confidence = df['category_confidence'].mean() * 100
-        st.metric("Avg Confidence", f"{avg_confidence:.0f}%")
-    
-    st.markdown("---")
-    
-    # Review mode selection
-    review_mode = st.radio(
-        "Review Mode:",
-        ["One at a Time", "Bulk Review"],
-        horizontal=True,
-        key="review_mode"
-    )
-    
-    if review_mode == "One at a Time":
-        render_single_review(df, taxonomy, conn)
-    else:
-        render_bulk_review(df, taxonomy, conn)
-    
-    conn.close()
 
 
 def render_single_review(df, taxonomy, conn):
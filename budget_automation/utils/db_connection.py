@@ -1,8 +1,12 @@
 """
 Database connection utilities
 """
+import atexit
 import os
+import threading
 import psycopg2
+from psycopg2.extensions import connection as _PGConnection
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -11,6 +15,67 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+class _PooledConnection(_PGConnection):
+    """
+    Connection handed out by the shared pool. close() returns it to the pool
+    (rolling back any open transaction) instead of disconnecting, so existing
+    `conn.close()` call sites keep working unchanged.
+    """
+    _checked_out = False
+
+    def close(self):
+        # While the pool is shutting down, closeall() holds the pool's lock and
+        # calls close() on connections that are still checked out; handing them
+        # back via putconn() would deadlock on that lock, so just disconnect.
+        if self._checked_out and not _pool_closing:
+            self._checked_out = False
+            _pool.putconn(self)  # may call close() again to really disconnect
+        else:
+            self._checked_out = False
+            super().close()
+
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+_pool_closing = False
+
+
+def _close_pool():
+    """atexit hook: disconnect every pooled connection, checked out or not."""
+    global _pool_closing
+    _pool_closing = True
+    _pool.closeall()
+
+
+def _default_connect_kwargs() -> dict:
+    """Connection settings from the environment (DATABASE_URL, then DB_*)."""
+    dsn = os.getenv('DATABASE_URL')
+    if dsn:
+        return {'dsn': dsn}
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', '5432')),
+        'database': os.getenv('DB_NAME', 'budget_db'),
+        'user': os.getenv('DB_USER', 'budget_user'),
+        'password': os.getenv('DB_PASSWORD', 'budget_password_local_dev'),
+    }
+
+
+def _get_pool() -> ThreadedConnectionPool:
+    """Create the process-wide pool on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(
+                1,
+                int(os.getenv('DB_POOL_MAX', '4')),
+                connection_factory=_PooledConnection,
+                **_default_connect_kwargs(),
+            )
+            atexit.register(_close_pool)
+    return _pool
+
+
 def get_db_connection(
     host: Optional[str] = None,
     port: Optional[int] = None,
@@ -29,14 +94,30 @@ def get_db_connection(
         password: Database password (default: from DB_PASSWORD env var)
         
     Returns:
-        psycopg2 connection object
+        psycopg2 connection object (call close() when done; pooled
+        connections go back to the pool)
     """
     # Managed hosts (Fly.io, Render, Railway, …) provide a single DATABASE_URL.
     # Prefer it when no explicit overrides are passed; fall back to discrete
     # DB_* vars for local dev.
-    dsn = os.getenv('DATABASE_URL')
-    if dsn and not any([host, port, database, user, password]):
-        return psycopg2.connect(dsn)
+    #
+    # The environment-configured connection comes from a process-wide pool, so
+    # long-lived callers (the Streamlit review queue, scripts that open and
+    # close connections in a loop) reuse a warm backend instead of paying
+    # connect + auth each time. Explicit overrides get a dedicated connection.
+    #
+    # getconn() doesn't wait for a connection to come back: past DB_POOL_MAX
+    # checked out (e.g. many Streamlit sessions) it raises PoolError. Those
+    # callers get a dedicated connection instead, as before pooling.
+    if not any([host, port, database, user, password]):
+        try:
+            conn = _get_pool().getconn()
+        except PoolError:
+            return psycopg2.connect(**_default_connect_kwargs())
+        if conn.autocommit:
+            conn.autocommit = False
+        conn._checked_out = True
+        return conn
 
     return psycopg2.connect(
         host=host or os.getenv('DB_HOST', 'localhost'),
@@ -47,6 +128,17 @@ def get_db_connection(
     )
 
 
+def ensure_prepared(cursor, name: str, prepare_sql: str):
+    """
+    PREPARE a statement unless this session already has it. Prepared
+    statements outlive transactions, and pooled connections are reused
+    across runs, so a bare PREPARE can fail with "already exists".
+    """
+    cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (name,))
+    if not cursor.fetchone():
+        cursor.execute(prepare_sql)
+
+
 def test_connection() -> bool:
     """
     Test database connection
@@ -0,0 +1,11 @@
+"""
+Helpers for bulk-loading rows with COPY ... FROM STDIN (FORMAT CSV)
+"""
+
+
+def copy_field(value) -> str:
+    """Format one value for COPY ... (FORMAT CSV): NULL is an unquoted empty
+    field, everything else is quoted so empty strings stay empty strings."""
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
@@ -0,0 +1,313 @@
+"""
+Tests for the Amazon line-item row builder and batched order matching.
+
+build_line_item_rows is pure (no DB, no LLM when no categorizer is passed) and
+the matching query is stubbed out, so these run without a database or API key.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+import budget_automation.core.amazon_enrichment as amazon_enrichment
+from budget_automation.core.amazon_enrichment import (
+    _LINE_ITEM_COLUMNS,
+    build_line_item_rows,
+    categorize_product_with_llm,
+    find_matching_transactions,
+    insert_line_items,
+    write_expanded_orders,
+    normalize_product_name,
+    precategorize_products,
+    save_product_category_cache,
+)
+
+
+class _FakeConn:
+    def cursor(self):
+        return self
+
+    def close(self):
+        pass
+
+
+class _CountingCategorizer:
+    enabled = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def categorize(self, **kwargs):
+        self.calls += 1
+        return {'category': 'Home', 'subcategory': 'Supplies'}
+
+    def categorize_batch(self, transactions, chunk_size=50):
+        self.batches = getattr(self, 'batches', []) + [[t['merchant_detail'] for t in transactions]]
+        return [{'category': 'Home', 'subcategory': 'Supplies'}] * (len(transactions) - 1) + [None]
+
+
+def _item(product_name, asin, quantity, total_owed):
+    return {'product_name': product_name, 'name_short': product_name[:60], 'asin': asin,
+            'quantity': quantity, 'total_owed': Decimal(total_owed)}
+
+
+def _order():
+    return {
+        'order_id': '111-0000000-0000001',
+        'order_date': datetime(2024, 3, 1),
+        'total': Decimal('30.00'),
+        'payment_instrument': 'Visa - 1234',
+        'items': [
+            _item('USB-C Cable', 'B000000001', 2, '12.50'),
+            _item('Notebook ' * 10, 'B000000002', 1, '17.50'),
+        ],
+    }
+
+
+def test_one_row_per_item_in_column_order():
+    order = _order()
+    rows = build_line_item_rows(order, 2, order['order_date'], None, 'credit_card', 'Visa - 1234')
+
+    assert len(rows) == 2
+    row = dict(zip(_LINE_ITEM_COLUMNS, rows[0]))
+    assert row['account_id'] == 2
+    assert row['txn_date'] == row['post_date'] == order['order_date']
+    assert row['amount'] == 12.5
+    assert row['merchant_norm'] == 'AMAZON'
+    assert (row['category'], row['subcategory']) == ('Shopping', 'Amazon')
+    assert row['source'] == row['created_by'] == 'amazon_enrichment'
+    assert row['notes'].startswith(f"Order: {order['order_id']} | ASIN: B000000001 | Qty: 2")
+
+
+def test_row_hash_is_stable_and_detail_truncated():
+    order = _order()
+    first = build_line_item_rows(order, 2, order['order_date'], None, 'unknown')
+    second = build_line_item_rows(order, 2, order['order_date'], None, 'unknown')
+
+    hash_idx = _LINE_ITEM_COLUMNS.index('source_row_hash')
+    detail_idx = _LINE_ITEM_COLUMNS.index('merchant_detail')
+    assert [r[hash_idx] for r in first] == [r[hash_idx] for r in second]
+    assert first[0][hash_idx] != first[1][hash_idx]
+    assert len(first[1][detail_idx]) == 60
+
+
+def test_match_sends_every_order_in_one_query(monkeypatch):
+    calls = []
+
+    def fake_execute_values(cursor, sql, argslist, template=None, page_size=100, fetch=False):
+        calls.append(list(argslist))
+        return [('111-0000000-0000001', 42, date(2024, 3, 2), Decimal('30.00'), 'AMAZON MKTPL', 7)]
+
+    monkeypatch.setattr(amazon_enrichment, 'execute_values', fake_execute_values)
+    other = dict(_order(), order_id='111-0000000-0000002')
+
+    matches = find_matching_transactions(_FakeConn(), [_order(), other])
+
+    assert len(calls) == 1
+    assert [args[0] for args in calls[0]] == ['111-0000000-0000001', '111-0000000-0000002']
+    assert matches == {
+        '111-0000000-0000001': {
+            'txn_id': 42, 'txn_date': date(2024, 3, 2),
+            'amount': Decimal('30.00'), 'merchant_raw': 'AMAZON MKTPL', 'account_id': 7,
+        },
+    }
+
+
+def test_match_assigns_each_charge_to_one_order(monkeypatch):
+    # Two same-total orders in one window: both see both charges as candidates
+    candidates = [
+        ('111-0000000-0000001', 42, date(2024, 3, 2), Decimal('30.00'), 'AMAZON MKTPL', 7),
+        ('111-0000000-0000001', 43, date(2024, 3, 3), Decimal('30.00'), 'AMAZON MKTPL', 7),
+        ('111-0000000-0000002', 42, date(2024, 3, 2), Decimal('30.00'), 'AMAZON MKTPL', 7),
+        ('111-0000000-0000002', 43, date(2024, 3, 3), Decimal('30.00'), 'AMAZON MKTPL', 7),
+    ]
+    monkeypatch.setattr(amazon_enrichment, 'execute_values', lambda *args, **kwargs: candidates)
+    other = dict(_order(), order_id='111-0000000-0000002')
+
+    matches = find_matching_transactions(_FakeConn(), [_order(), other])
+
+    assert matches['111-0000000-0000001']['txn_id'] == 42
+    assert matches['111-0000000-0000002']['txn_id'] == 43
+
+
+def test_match_without_orders_skips_query():
+    assert find_matching_transactions(None, []) == {}
+
+
+def test_normalize_product_name():
+    assert normalize_product_name('  USB-C  Cable, 6ft!! ') == 'usb c cable 6ft'
+    assert len(normalize_product_name('x' * 200)) == 80
+
+
+def test_category_cache_hits_by_asin_then_name():
+    llm = _CountingCategorizer()
+    cache = {}
+
+    first = categorize_product_with_llm('USB-C Cable', llm, cache, 'B000000001')
+    by_asin = categorize_product_with_llm('Renamed listing', llm, cache, 'B000000001')
+    by_name = categorize_product_with_llm('usb-c  CABLE', llm, cache, 'B000000009')
+
+    assert first == by_asin == by_name == ('Home', 'Supplies')
+    assert llm.calls == 1
+
+
+def test_precategorize_batches_unique_uncached_products():
+    llm = _CountingCategorizer()
+    repeat = dict(_order(), order_id='111-0000000-0000002')
+    cache = {('asin', 'B000000002'): ('Office', 'Paper')}
+
+    precategorize_products([_order(), repeat], llm, cache)
+
+    # One batch, one entry per product not already cached
+    assert llm.batches == [['USB-C Cable']]
+    # The batch dropped the last product, so it stays uncached
+    assert ('asin', 'B000000001') not in cache
+
+    llm.batches = []
+    extra = dict(_order(), items=[
+        _item('Desk Lamp', 'B000000003', 1, '20'),
+        _item('Stapler', 'B000000004', 1, '8'),
+    ])
+    precategorize_products([extra], llm, cache)
+
+    assert llm.batches == [['Desk Lamp', 'Stapler']]
+    assert categorize_product_with_llm('Desk Lamp', llm, cache, 'B000000003') == ('Home', 'Supplies')
+    assert llm.calls == 0
+
+
+def test_cache_hit_used_without_llm():
+    cache = {('asin', 'B000000001'): ('Tech', 'Accessories')}
+    assert categorize_product_with_llm('USB-C Cable', None, cache, 'B000000001') == ('Tech', 'Accessories')
+    assert categorize_product_with_llm('Other', None, cache, 'B000000009') == ('Shopping', 'Amazon')
+
+
+def test_save_writes_only_new_asins(monkeypatch):
+    written = []
+
+    class _Conn(_FakeConn):
+        def commit(self):
+            pass
+
+    monkeypatch.setattr(
+        amazon_enrichment, 'execute_values',
+        lambda cursor, sql, argslist, **kwargs: written.extend(argslist),
+    )
+    cache = {
+        ('asin', 'B000000001'): ('Tech', 'Accessories'),
+        ('asin', 'B000000002'): ('Office', 'Paper'),
+        ('name', 'usb c cable'): ('Tech', 'Accessories'),
+    }
+    known = {('asin', 'B000000002')}
+
+    saved = save_product_category_cache(_Conn(), [_order(), _order()], cache, known)
+
+    assert saved == 1
+    assert written == [('B000000001', 'USB-C Cable', 'Tech', 'Accessories')]
+    # A second save in the same run has nothing new to write
+    assert save_product_category_cache(_Conn(), [_order()], cache, known) == 0
+
+
+class _RecordingCursor:
+    def __init__(self, prepared=False):
+        self.prepared = prepared
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql.split()[0], params))
+
+    def fetchone(self):
+        if self.executed[-1][0] == 'EXECUTE':
+            return (3, 1, 2)
+        return (1,) if self.prepared else None
+
+    def close(self):
+        pass
+
+
+def test_insert_prepares_once_and_sends_columns_as_arrays(monkeypatch):
+    monkeypatch.setattr(amazon_enrichment, 'LINE_ITEM_PAGE_SIZE', 1)
+    order = _order()
+    rows = build_line_item_rows(order, 2, order['order_date'].date(), None, 'unknown')
+
+    cursor = _RecordingCursor()
+    insert_line_items(cursor, rows)
+
+    assert [verb for verb, _ in cursor.executed] == ['SELECT', 'PREPARE', 'EXECUTE', 'EXECUTE']
+    first_page = cursor.executed[2][1]
+    assert len(first_page) == len(_LINE_ITEM_COLUMNS)
+    assert first_page[_LINE_ITEM_COLUMNS.index('amount')] == [12.5]
+
+    reused = _RecordingCursor(prepared=True)
+    insert_line_items(reused, rows)
+    assert 'PREPARE' not in [verb for verb, _ in reused.executed]
+
+
+def test_precategorize_dedups_by_asin_across_renamed_listings():
+    llm = _CountingCategorizer()
+    renamed = dict(_order(), items=[_item('USB-C Cable (2-pack, new listing)', 'B000000001', 1, '12.50')])
+
+    precategorize_products([_order(), renamed], llm, {('asin', 'B000000002'): ('Office', 'Paper')})
+
+    assert llm.batches == [['USB-C Cable']]
+
+
+def test_write_batch_is_one_statement_and_commits():
+    cursor = _RecordingCursor(prepared=True)
+
+    class _Conn:
+        committed = False
+
+        def cursor(self):
+            return cursor
+
+        def commit(self):
+            self.committed = True
+
+    conn = _Conn()
+    order = _order()
+    rows = build_line_item_rows(order, 2, order['order_date'].date(), None, 'unknown')
+
+    counts = write_expanded_orders(conn, rows, [42], [order['order_id']])
+
+    assert counts == (3, 1, 2)
+    assert conn.committed
+    assert [verb for verb, _ in cursor.executed] == ['SELECT', 'EXECUTE']
+    params = cursor.executed[1][1]
+    assert len(params) == len(_LINE_ITEM_COLUMNS) + 2
+    assert params[-2:] == [[42], [order['order_id']]]
+
+
+class _WriteConn:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = self.rolled_back = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_write_rejects_charge_claimed_twice():
+    cursor = _RecordingCursor(prepared=True)
+    order = _order()
+    rows = build_line_item_rows(order, 2, order['order_date'].date(), None, 'unknown')
+
+    with pytest.raises(ValueError, match='more than one order'):
+        write_expanded_orders(_WriteConn(cursor), rows, [42, 42], ['a', 'b'])
+    assert cursor.executed == []
+
+
+def test_write_rolls_back_when_a_charge_is_gone():
+    cursor = _RecordingCursor(prepared=True)  # EXECUTE reports 1 deleted
+    conn = _WriteConn(cursor)
+    order = _order()
+    rows = build_line_item_rows(order, 2, order['order_date'].date(), None, 'unknown')
+
+    with pytest.raises(ValueError, match='not found'):
+        write_expanded_orders(conn, rows, [42, 43], ['a', 'b'])
+    assert conn.rolled_back and not conn.committed
@@ -0,0 +1,155 @@
+"""
+Tests for the Amazon order-history importer: CSV parsing and the COPY payload.
+
+The cursor is a stub that records statements and the COPY buffer, so these run
+without a database.
+"""
+import csv
+from datetime import datetime, timezone
+
+from budget_automation.core.amazon_import import (
+    _STAGING_COLUMNS,
+    _CopyReader,
+    _insert_orders,
+    _parse_timestamp,
+    _stage_orders,
+    _unique_orders,
+    iter_amazon_csv,
+    parse_amazon_csv,
+)
+
+
+HEADER = [
+    '﻿"Website"', 'Order ID', 'Order Date', 'Purchase Order Number', 'Currency',
+    'Unit Price', 'Unit Price Tax', 'Shipping Charge', 'Total Discounts', 'Total Owed',
+    'Shipment Item Subtotal', 'Shipment Item Subtotal Tax', 'ASIN', 'Product Condition',
+    'Quantity', 'Payment Instrument Type', 'Order Status', 'Shipment Status', 'Ship Date',
+    'Shipping Option', 'Shipping Address', 'Billing Address',
+    'Carrier Name & Tracking Number', 'Product Name', 'Gift Message', 'Gift Sender Name',
+    'Gift Recipient Contact Details', 'Item Serial Number',
+]
+
+
+def _row(**overrides):
+    row = {
+        '﻿"Website"': 'Amazon.com', 'Order ID': '111-0000000-0000001',
+        'Order Date': '2024-03-01T15:04:05Z', 'Purchase Order Number': 'Not Applicable',
+        'Currency': 'USD', 'Unit Price': '12.5', 'Unit Price Tax': '1.03',
+        'Shipping Charge': '0', 'Total Discounts': "'-0'", 'Total Owed': '13.53',
+        'Shipment Item Subtotal': '12.5', 'Shipment Item Subtotal Tax': '1.03',
+        'ASIN': 'B000000001', 'Product Condition': 'New', 'Quantity': '1',
+        'Payment Instrument Type': 'Visa - 1234', 'Order Status': 'Closed',
+        'Shipment Status': 'Shipped', 'Ship Date': '2024-03-02T01:02:03Z',
+        'Shipping Option': 'std-us', 'Shipping Address': 'Jane Doe 1 Main St',
+        'Billing Address': 'Jane Doe 1 Main St',
+        'Carrier Name & Tracking Number': 'UPS(1Z999)',
+        'Product Name': 'USB-C Cable, "braided"', 'Gift Message': 'Not Available',
+        'Gift Sender Name': 'Not Available', 'Gift Recipient Contact Details': 'Not Available',
+        'Item Serial Number': 'Not Available',
+    }
+    row.update(overrides)
+    return row
+
+
+def _write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        # The BOM'd "Website" header is written raw, as Amazon's export has it
+        f.write(','.join(h if h.startswith('﻿') else f'"{h}"' for h in HEADER) + '\n')
+        writer = csv.DictWriter(f, fieldnames=HEADER, quoting=csv.QUOTE_ALL)
+        writer.writerows(rows)
+
+
+class _CopyCursor:
+    def __init__(self):
+        self.statements = []
+        self.copied = None
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy_expert(self, sql, buf):
+        self.statements.append(sql)
+        self.copied = buf.read()
+        self.rowcount = self.copied.count('\n')
+
+
+def test_parse_fields(tmp_path):
+    path = tmp_path / 'orders.csv'
+    _write_csv(path, [_row(), _row(**{'ASIN': '', 'Order ID': '111-0000000-0000002'})])
+
+    orders = parse_amazon_csv(path)
+
+    assert len(orders) == 1  # row without an ASIN is dropped
+    order = orders[0]
+    assert order['website'] == 'Amazon.com'
+    assert order['order_date'] == datetime(2024, 3, 1, 15, 4, 5, tzinfo=timezone.utc)
+    assert order['ship_date'] == datetime(2024, 3, 2, 1, 2, 3, tzinfo=timezone.utc)
+    assert order['unit_price'] == 12.5
+    assert order['quantity'] == 1
+    assert order['total_discounts'] is None  # Amazon's "'-0'" isn't numeric
+    assert order['gift_message'] is None
+    assert order['product_name'] == 'USB-C Cable, "braided"'
+
+
+def test_copy_payload_quotes_values_and_appends_batch_id(tmp_path):
+    path = tmp_path / 'orders.csv'
+    _write_csv(path, [_row()])
+    orders = parse_amazon_csv(path)
+
+    cursor = _CopyCursor()
+    _stage_orders(cursor, orders, '20240301_000000')
+
+    fields = next(csv.reader([cursor.copied]))
+    assert len(fields) == len(_STAGING_COLUMNS)
+    assert fields[_STAGING_COLUMNS.index('product_name')] == 'USB-C Cable, "braided"'
+    assert fields[-1] == '20240301_000000'
+    # NULLs are unquoted empty fields, distinct from quoted empty strings
+    assert ',,' in cursor.copied
+
+
+def test_insert_skips_already_imported_rows_server_side(monkeypatch, tmp_path):
+    import budget_automation.core.amazon_import as amazon_import
+
+    path = tmp_path / 'orders.csv'
+    _write_csv(path, [_row(), _row(**{'ASIN': 'B000000002'})])
+    orders = parse_amazon_csv(path)
+    calls = []
+
+    def fake_execute_values(cursor, sql, argslist, page_size=100, fetch=False):
+        calls.append((sql, list(argslist), fetch))
+        return [(1,)]  # one of the two rows was already there
+
+    monkeypatch.setattr(amazon_import, 'execute_values', fake_execute_values)
+
+    assert _insert_orders(_CopyCursor(), orders, '20240301_000000') == 1
+    sql, rows, fetch = calls[0]
+    assert 'ON CONFLICT (order_id, asin) DO NOTHING' in sql
+    assert fetch and len(rows) == 2
+
+
+def test_stream_dedups_and_reads_in_chunks(tmp_path):
+    path = tmp_path / 'orders.csv'
+    _write_csv(path, [_row(), _row(), _row(**{'ASIN': 'B000000002'})])
+    counts = {'parsed': 0, 'duplicates_in_csv': 0}
+
+    reader = _CopyReader(_unique_orders(iter_amazon_csv(path), counts), 'b1')
+    chunks = []
+    while True:
+        chunk = reader.read(64)
+        if not chunk:
+            break
+        assert len(chunk) <= 64
+        chunks.append(chunk)
+
+    assert counts == {'parsed': 3, 'duplicates_in_csv': 1}
+    lines = list(csv.reader(''.join(chunks).splitlines()))
+    assert [line[_STAGING_COLUMNS.index('asin')] for line in lines] == ['B000000001', 'B000000002']
+
+
+def test_parse_timestamp_fast_path_matches_isoformat():
+    for value in ('2024-03-01T15:04:05Z', '2019-12-31T23:59:59Z'):
+        assert _parse_timestamp(value) == datetime.fromisoformat(value.replace('Z', '+00:00'))
+    # Other ISO shapes still parse
+    assert _parse_timestamp('2024-03-01T15:04:05.250Z').microsecond == 250000
+    assert _parse_timestamp('2024-03-01 15:04:05+00:00').hour == 15
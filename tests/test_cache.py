@@ -0,0 +1,68 @@
+"""
+Tests for the on-disk categorization-inputs cache. The fingerprint query and
+the DB loaders are stubbed out, so these run without a database.
+"""
+import budget_automation.core.cache as cache
+
+
+class _FakeCursor:
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchone(self):
+        return self.fingerprint
+
+    def close(self):
+        pass
+
+
+class _FakeConn:
+    def __init__(self, fingerprint=("r1", "c1", "s1")):
+        self.fingerprint = fingerprint
+
+    def cursor(self):
+        return _FakeCursor(self.fingerprint)
+
+    def rollback(self):
+        pass
+
+
+def _stub_loaders(monkeypatch, calls):
+    def load_taxonomy(conn):
+        calls.append("taxonomy")
+        return {"categories": [{"name": "Food", "subcategories": ["Coffee"]}]}
+
+    def load_rules(conn):
+        calls.append("rules")
+        return [{"rule_id": 1, "match_value": "STARBUCKS"}]
+
+    monkeypatch.setattr(cache, "load_taxonomy_from_db", load_taxonomy)
+    monkeypatch.setattr(cache, "load_rules_from_db", load_rules)
+
+
+def test_second_load_hits_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    calls = []
+    _stub_loaders(monkeypatch, calls)
+
+    first = cache.load_categorization_inputs(_FakeConn())
+    second = cache.load_categorization_inputs(_FakeConn())
+
+    assert first == second
+    assert calls == ["taxonomy", "rules"]
+    assert len(list(tmp_path.glob("categorization-*.pkl"))) == 1
+
+
+def test_changed_fingerprint_reloads_and_drops_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    calls = []
+    _stub_loaders(monkeypatch, calls)
+
+    cache.load_categorization_inputs(_FakeConn(("r1", "c1", "s1")))
+    cache.load_categorization_inputs(_FakeConn(("r2", "c1", "s1")))
+
+    assert calls == ["taxonomy", "rules", "taxonomy", "rules"]
+    assert len(list(tmp_path.glob("categorization-*.pkl"))) == 1
@@ -0,0 +1,80 @@
+"""
+Tests for CategorizationOrchestrator.categorize_batch. The LLM categorizer is
+a stub, so these run without an API key.
+"""
+from budget_automation.core.categorization_orchestrator import (
+    CategorizationOrchestrator,
+    Transaction,
+)
+
+
+RULES = [{
+    'rule_id': 1, 'rule_pack': 'test', 'priority': 100, 'match_type': 'exact',
+    'match_value': 'AMAZON', 'match_detail': None, 'category': 'Shopping',
+    'subcategory': 'Amazon', 'is_active': True, 'created_by': 'test', 'notes': None,
+}]
+
+
+class _StubLLM:
+    def __init__(self):
+        self.batches = []
+
+    def categorize_batch(self, transactions):
+        self.batches.append([(t['merchant_norm'], t['direction']) for t in transactions])
+        return [
+            {'category': 'Food & Drink', 'subcategory': 'Coffee', 'confidence': 0.95,
+             'rationale': t['merchant_norm']}
+            for t in transactions
+        ]
+
+
+def _txn(merchant_norm, amount=-5.0, direction='debit'):
+    return Transaction(
+        txn_id=None, merchant_norm=merchant_norm, merchant_detail=None,
+        description_raw=merchant_norm, amount=amount, direction=direction,
+        txn_date='2025-01-15', post_date='2025-01-15', account_id=1,
+        source='test', type='Sale', is_return=False,
+    )
+
+
+def _orchestrator(llm):
+    orchestrator = CategorizationOrchestrator({'categories': []}, RULES, enable_llm=False)
+    orchestrator.enable_llm = True
+    orchestrator.llm_categorizer = llm
+    return orchestrator
+
+
+def test_repeat_merchants_sent_to_llm_once():
+    llm = _StubLLM()
+    txns = [
+        _txn('CORNER CAFE'), _txn('AMAZON'), _txn('CORNER CAFE', -7.25),
+        _txn('CORNER CAFE', 3.0, 'credit'), _txn('BAGEL SHOP'),
+    ]
+
+    results = _orchestrator(llm).categorize_batch(txns)
+
+    assert llm.batches == [[('CORNER CAFE', 'debit'), ('CORNER CAFE', 'credit'), ('BAGEL SHOP', 'debit')]]
+    assert [t.merchant_norm for t in results] == [
+        'AMAZON', 'CORNER CAFE', 'CORNER CAFE', 'CORNER CAFE', 'BAGEL SHOP',
+    ]
+    assert all(t.category_source == 'llm' for t in results[1:])
+    assert results[0].category_source == 'rule'
+
+
+def test_transaction_is_slotted():
+    txn = _txn('CORNER CAFE')
+    assert not hasattr(txn, '__dict__')
+
+
+def test_single_transaction_goes_through_batch_path():
+    llm = _StubLLM()
+    orchestrator = _orchestrator(llm)
+
+    ruled = orchestrator.categorize_transaction(_txn('AMAZON'))
+    suggested = orchestrator.categorize_transaction(_txn('CORNER CAFE'))
+
+    assert (ruled.category_source, ruled.category_confidence) == ('rule', 1.0)
+    assert (suggested.category_source, suggested.needs_review) == ('llm', False)
+    assert llm.batches == [[('CORNER CAFE', 'debit')]]
+    assert orchestrator.stats['total'] == 2
+    assert orchestrator.stats['rule_match'] == orchestrator.stats['llm_suggest'] == 1
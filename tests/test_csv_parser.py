@@ -0,0 +1,139 @@
+"""
+Tests for the Chase CSV parsers. Files are written to tmp_path, so these run
+without a database.
+"""
+import hashlib
+from decimal import Decimal
+
+import pytest
+
+from budget_automation.core.csv_parser import TransactionParser, parse_chase_csv
+
+
+CHECKING = (
+    'Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n'
+    'DEBIT,01/15/2025,"STARBUCKS STORE 123",-4.50,DEBIT_CARD,995.50,,\n'
+    '\n'
+    'CREDIT,01/16/2025,"PAYROLL, ACME INC",2000.00,ACH_CREDIT,2995.50,,\n'
+)
+CREDIT = (
+    'Transaction Date,Post Date,Description,Category,Type,Amount,Memo\n'
+    '01/14/2025,01/15/2025,AMAZON MKTPL*AB12,Shopping,Sale,-25.99,\n'
+    '01/20/2025,01/21/2025,AMAZON MKTPL*AB12,Shopping,Return,25.99,refund\n'
+)
+
+
+def test_row_hash_format_is_pinned():
+    # source_row_hash values already in the DB were produced with exactly this
+    # key and algorithm; changing either silently breaks re-import dedup.
+    parser = TransactionParser()
+    row = {'txn_date': '2025-01-15', 'description_raw': 'STARBUCKS STORE 123',
+           'amount': '4.50', 'account_id': 1}
+
+    first = parser.compute_row_hash(row)
+    second = parser.compute_row_hash(row)
+
+    assert first == hashlib.sha256(b'2025-01-15|STARBUCKS STORE 123|4.50|1|1').hexdigest()
+    assert second == hashlib.sha256(b'2025-01-15|STARBUCKS STORE 123|4.50|1|2').hexdigest()
+
+
+def test_checking_rows(tmp_path):
+    path = tmp_path / 'checking.csv'
+    path.write_text(CHECKING)
+
+    txns = parse_chase_csv(path)
+
+    assert [t['description_raw'] for t in txns] == ['STARBUCKS STORE 123', 'PAYROLL, ACME INC']
+    first = txns[0]
+    assert (first['txn_date'], first['post_date']) == ('2025-01-15', '2025-01-15')
+    assert (first['amount'], first['direction'], first['type']) == (Decimal('4.50'), 'debit', 'DEBIT_CARD')
+    assert first['account_id'] == 1 and first['memo'] is None
+    assert txns[1]['direction'] == 'credit'
+
+
+def test_credit_rows(tmp_path):
+    path = tmp_path / 'credit.csv'
+    path.write_text(CREDIT)
+
+    sale, refund = parse_chase_csv(path)
+
+    assert (sale['txn_date'], sale['post_date']) == ('2025-01-14', '2025-01-15')
+    assert sale['memo'] is None and not sale['is_return']
+    assert refund['memo'] == 'refund' and refund['is_return']
+    assert sale['source_row_hash'] != refund['source_row_hash']
+
+
+def test_parse_date_formats_and_memo():
+    parser = TransactionParser()
+
+    assert parser.parse_date('01/30/2025') == '2025-01-30'
+    assert parser.parse_date('1/30/23') == '2023-01-30'
+    assert parser.parse_date('2025-01-30') == '2025-01-30'
+    assert parser.parse_date('') is None
+    assert parser._date_cache['1/30/23'] == '2023-01-30'
+    with pytest.raises(ValueError):
+        parser.parse_date('30.01.2025')
+    assert '30.01.2025' not in parser._date_cache
+
+
+def test_repeated_descriptions_hit_the_normalizer_cache(tmp_path):
+    from budget_automation.core.merchant_normalizer import normalize_merchant
+
+    normalize_merchant.cache_clear()
+    path = tmp_path / 'credit.csv'
+    path.write_text(CREDIT)
+
+    sale, refund = parse_chase_csv(path)
+
+    info = normalize_merchant.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    assert (sale['merchant_norm'], sale['merchant_detail']) == (refund['merchant_norm'], refund['merchant_detail'])
+
+
+def test_parse_date_tries_last_format_first(monkeypatch):
+    import budget_automation.core.csv_parser as csv_parser
+
+    parser = TransactionParser()
+    parser.parse_date('2025-01-30')
+    tried = []
+    real = csv_parser.datetime
+
+    class _Recording:
+        @staticmethod
+        def strptime(value, fmt):
+            tried.append(fmt)
+            return real.strptime(value, fmt)
+
+    monkeypatch.setattr(csv_parser, 'datetime', _Recording)
+
+    assert parser.parse_date('2025-02-01') == '2025-02-01'
+    assert tried == ['%Y-%m-%d']
+    assert parser.parse_date('1/5/2025') == '2025-01-05'
+
+
+def test_sniff_handles_bom_and_unknown_headers(tmp_path):
+    path = tmp_path / 'credit.csv'
+    path.write_bytes(b'\xef\xbb\xbf' + CREDIT.encode())
+    assert len(parse_chase_csv(path)) == 2
+
+    other = tmp_path / 'other.csv'
+    other.write_text('Date,Payee,Amount\n01/15/2025,X,1.00\n')
+    with pytest.raises(ValueError, match='Header: Date,Payee,Amount'):
+        parse_chase_csv(other)
+
+
+def test_rows_are_read_with_the_large_buffer(tmp_path, monkeypatch):
+    from budget_automation.core import csv_parser
+
+    opened = []
+
+    def recording_open(path, mode='r', **kwargs):
+        opened.append((mode, kwargs.get('buffering')))
+        return open(path, mode, **kwargs)
+
+    monkeypatch.setattr(csv_parser, 'open', recording_open, raising=False)
+    path = tmp_path / 'checking.csv'
+    path.write_text(CHECKING)
+
+    assert len(parse_chase_csv(path)) == 2
+    assert ('r', csv_parser.CSV_BUFFER_SIZE) in opened
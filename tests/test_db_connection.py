@@ -0,0 +1,66 @@
+"""
+Tests for the shared connection pool's shutdown and exhaustion paths and
+ensure_prepared. The pool is created with no connections, a never-connected
+connection object stands in for a checked-out one, and the cursor is a stub,
+so these run without a database.
+"""
+import threading
+
+from psycopg2.pool import ThreadedConnectionPool
+
+import budget_automation.utils.db_connection as db_connection
+
+
+def test_exit_hook_closes_checked_out_connection_without_deadlock(monkeypatch):
+    pool = ThreadedConnectionPool(0, 2, dsn='')
+    conn = db_connection._PooledConnection.__new__(db_connection._PooledConnection)
+    conn._checked_out = True
+    pool._used[id(conn)] = conn
+    pool._rused[id(conn)] = id(conn)
+    monkeypatch.setattr(db_connection, '_pool', pool)
+    monkeypatch.setattr(db_connection, '_pool_closing', False)
+
+    worker = threading.Thread(target=db_connection._close_pool, daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+
+    assert not worker.is_alive()
+    assert pool.closed
+    assert not conn._checked_out
+
+
+class _PreparedCursor:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.prepared = []
+        self._last = None
+
+    def execute(self, sql, params=None):
+        if params:
+            self._last = params[0] in self.existing
+        else:
+            self.prepared.append(sql.split()[1])
+
+    def fetchone(self):
+        return (1,) if self._last else None
+
+
+def test_ensure_prepared_skips_statements_the_session_has():
+    cursor = _PreparedCursor(existing={'review_find_rule'})
+
+    db_connection.ensure_prepared(cursor, 'review_find_rule', 'PREPARE review_find_rule AS SELECT 1')
+    db_connection.ensure_prepared(cursor, 'review_insert_rule', 'PREPARE review_insert_rule AS SELECT 2')
+
+    assert cursor.prepared == ['review_insert_rule']
+
+
+def test_exhausted_pool_falls_back_to_a_dedicated_connection(monkeypatch):
+    pool = ThreadedConnectionPool(0, 1, dsn='')
+    busy = db_connection._PooledConnection.__new__(db_connection._PooledConnection)
+    pool._used[id(busy)] = busy
+    dedicated = object()
+    monkeypatch.setattr(db_connection, '_pool', pool)
+    monkeypatch.setattr(db_connection.psycopg2, 'connect', lambda **kwargs: dedicated)
+
+    assert db_connection.get_db_connection() is dedicated
+    assert list(pool._used.values()) == [busy]
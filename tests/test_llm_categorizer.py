@@ -0,0 +1,128 @@
+"""
+Tests for LLMCategorizer request building. The Anthropic client is a stub that
+records each messages.create call, so these run without an API key.
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from budget_automation.core.llm_categorizer import LLMCategorizer
+
+
+TAXONOMY = {'categories': [{'name': 'Food & Drink', 'subcategories': ['Coffee', 'Groceries']}]}
+
+
+class _StubMessages:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        prompt = kwargs['messages'][0]['content']
+        count = sum(1 for line in prompt.splitlines() if line[:1].isdigit())
+        body = [{'txn': i + 1, 'category': 'Food & Drink', 'subcategory': 'Coffee',
+                 'confidence': 0.9, 'rationale': 'cafe'} for i in range(count)]
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(body))])
+
+
+def _categorizer(monkeypatch):
+    monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+    llm = LLMCategorizer(TAXONOMY)
+    llm.enabled = True
+    llm.client = SimpleNamespace(messages=_StubMessages())
+    return llm
+
+
+def _txn(merchant):
+    return {'merchant_norm': merchant, 'merchant_detail': None, 'description_raw': merchant,
+            'amount': -4.5, 'direction': 'debit'}
+
+
+def test_taxonomy_sent_once_as_cached_system_prompt(monkeypatch):
+    llm = _categorizer(monkeypatch)
+
+    results = llm.categorize_batch([_txn('CORNER CAFE'), _txn('BAGEL SHOP')], max_workers=1)
+
+    assert [r['subcategory'] for r in results] == ['Coffee', 'Coffee']
+    (call,) = llm.client.messages.calls
+    (system,) = call['system']
+    assert system['cache_control'] == {'type': 'ephemeral'}
+    assert 'Food & Drink: Coffee, Groceries' in system['text']
+    assert 'TAXONOMY' not in call['messages'][0]['content']
+
+
+def test_sequential_chunks_are_not_paced(monkeypatch):
+    import budget_automation.core.llm_categorizer as llm_categorizer
+
+    llm = _categorizer(monkeypatch)
+    monkeypatch.setattr(llm_categorizer.time, 'sleep', lambda s: pytest.fail('slept between chunks'))
+
+    results = llm.categorize_batch([_txn(f'CAFE {i}') for i in range(5)], chunk_size=2, max_workers=1)
+
+    assert len(results) == 5 and all(results)
+    assert len(llm.client.messages.calls) == 3
+
+
+def test_batch_keeps_no_memo_of_its_own(monkeypatch):
+    # Repeats are collapsed by the orchestrator (_llm_key); the categorizer
+    # sends what it is given, every call.
+    llm = _categorizer(monkeypatch)
+
+    llm.categorize_batch([_txn('CORNER CAFE')], max_workers=1)
+    llm.categorize_batch([_txn('CORNER CAFE')], max_workers=1)
+
+    assert len(llm.client.messages.calls) == 2
+
+def test_single_suggestion_validated_against_taxonomy(monkeypatch):
+    llm = _categorizer(monkeypatch)
+
+    def reply(category, subcategory):
+        body = {'category': category, 'subcategory': subcategory, 'confidence': 0.9, 'rationale': 'x'}
+        llm.client.messages.create = lambda **kwargs: SimpleNamespace(
+            content=[SimpleNamespace(text=json.dumps(body))])
+        return llm.categorize('CORNER CAFE', None, 'CORNER CAFE', -4.5, 'debit')
+
+    assert reply('Food & Drink', 'Coffee')['subcategory'] == 'Coffee'
+    assert reply('Food & Drink', 'Sushi') is None
+    assert reply('Travel', 'Coffee') is None
+
+
+def test_chunk_reply_inside_markdown_fence(monkeypatch):
+    llm = _categorizer(monkeypatch)
+    body = [{'txn': 1, 'category': 'Food & Drink', 'subcategory': 'Coffee',
+             'confidence': 0.9, 'rationale': 'cafe [coffee]'}]
+    text = 'Here you go:\n```json\n' + json.dumps(body, indent=2) + '\n```'
+    llm.client.messages.create = lambda **kwargs: SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    (result,) = llm._categorize_chunk([_txn('CORNER CAFE')])
+
+    assert result['rationale'] == 'cafe [coffee]'
+
+
+def test_batch_suggestions_validated_against_taxonomy(monkeypatch):
+    llm = _categorizer(monkeypatch)
+    body = [
+        {'txn': 1, 'category': 'Food & Drink', 'subcategory': 'Coffee', 'confidence': 0.9, 'rationale': 'x'},
+        {'txn': 2, 'category': 'Food & Drink', 'subcategory': 'Sushi', 'confidence': 0.9, 'rationale': 'x'},
+        {'txn': 3, 'category': 'Travel', 'subcategory': 'Coffee', 'confidence': 0.9, 'rationale': 'x'},
+    ]
+    llm.client.messages.create = lambda **kwargs: SimpleNamespace(
+        content=[SimpleNamespace(text=json.dumps(body))])
+
+    results = llm.categorize_batch([_txn('CORNER CAFE'), _txn('SUSHI BAR'), _txn('AIRLINE')], max_workers=1)
+
+    assert results[0]['subcategory'] == 'Coffee'
+    assert results[1:] == [None, None]
+
+
+def test_batch_lines_carry_the_transaction_type(monkeypatch):
+    llm = _categorizer(monkeypatch)
+    refund = dict(_txn('CORNER CAFE'), amount=4.5, direction='credit')
+
+    llm.categorize_batch([_txn('CORNER CAFE'), refund], max_workers=1)
+
+    (call,) = llm.client.messages.calls
+    prompt = call['messages'][0]['content']
+    assert '1. CORNER CAFE - $4.50 (Expense)' in prompt
+    assert '2. CORNER CAFE - $4.50 (Income/Credit)' in prompt
@@ -3,7 +3,14 @@ Tests for merchant normalization, focused on the Chase ACH-detail description
 format ("ORIG CO NAME:... CO ENTRY DESCR:...") that leaks through unnormalized
 and breaks Venmo enrichment matching. DB-free.
 """
-from budget_automation.core.merchant_normalizer import normalize_merchant
+import pytest
+
+from budget_automation.core.merchant_normalizer import _normalization_cases, normalize_merchant
+
+
+@pytest.mark.parametrize("raw, merchant, detail", _normalization_cases())
+def test_normalization_examples(raw, merchant, detail):
+    assert normalize_merchant(raw) == (merchant, detail)
 
 
 def test_ach_venmo_cashout():
@@ -47,3 +54,66 @@ def test_old_venmo_format_still_normalizes():
 def test_non_ach_description_unaffected():
     # A normal description without the ACH markers is untouched by the new path.
     assert normalize_merchant("SQ *BREADS BAKERY") == ("SQ", "BREADS BAKERY")
+
+
+def test_noise_passes_stay_sequential():
+    # The long-ID pass runs before the PPD ID pass, so the label survives;
+    # merchant_norm values already in the DB (and their rules) depend on it.
+    assert normalize_merchant(
+        "ACME UTILITY     PPD ID: 5264681992"
+    ) == ("ACME UTILITY PPD ID:", None)
+    assert normalize_merchant("BLUE BOTTLE COFFEE") == ("BLUE BOTTLE COFFEE", None)
+
+
+def test_alias_table_order_wins_over_match_position():
+    # DOORDASH is listed before UBER EATS, so it wins even though it matches later.
+    assert normalize_merchant("UBER EATS VIA DOORDASH") == ("DOORDASH", None)
+
+
+def test_zelle_extracts_payee():
+    assert normalize_merchant(
+        "Zelle payment to Devi Daycare  27420707612"
+    ) == ("ZELLE TO", "DEVI DAYCARE")
+
+
+def test_repeat_descriptions_hit_the_cache():
+    normalize_merchant.cache_clear()
+    for _ in range(3):
+        assert normalize_merchant("COSTCO WHSE #1215") == ("COSTCO", None)
+    assert normalize_merchant.cache_info().hits == 2
+
+
+def test_leading_literals_for_prescreen():
+    from budget_automation.core.merchant_normalizer import _leading_literals
+
+    assert _leading_literals([r'^CHASE.*AUTOPAY', r'^CHECK\s+\d+', r'^CHASE.*PAYMENT']) == ('CHASE', 'CHECK')
+    assert _leading_literals([r'^ABC?D']) == ('AB',)  # optional char isn't required
+    assert _leading_literals([r'^CHASE', r'\s+\d+']) is None
+    assert _leading_literals([r'^A|B']) is None
+
+
+def test_trailing_suffixes_strip_in_table_order():
+    assert normalize_merchant("ACME WIDGETS CO INC") == ("ACME WIDGETS", None)
+    assert normalize_merchant("ACME WIDGETS INC CO") == ("ACME WIDGETS INC", None)
+
+
+def test_pos_markers_keep_table_priority():
+    # SQ is checked before TST, so it wins even when TST comes first in the text.
+    assert normalize_merchant("TST* SQ *JOES CAFE") == ("SQ", "JOES CAFE")
+    assert normalize_merchant("TST* Long Island Bagel Ca") == ("TST", "LONG ISLAND BAGEL CA")
+
+
+def test_table_hits_share_one_result_tuple():
+    uncached = normalize_merchant.__wrapped__
+    assert uncached("INTEREST PAYMENT") is uncached("INTEREST PAYMENT ")
+    assert uncached("COSTCO WHSE #1") is uncached("COSTCO WHSE #2") == ("COSTCO", None)
+
+
+def test_strip_trailing_id_matches_regex():
+    import re
+
+    from budget_automation.core.merchant_normalizer import _strip_trailing_id
+
+    for text in ("DEVI DAYCARE  27420707612", "DEVI DAYCARE 123456789",
+                 "ACCT12345678901", "1234567890", "A \t1234567890", "BAKERY", ""):
+        assert _strip_trailing_id(text) == re.sub(r'\s+\d{10,}$', '', text).strip()
@@ -0,0 +1,76 @@
+"""
+Tests for RuleMatcher: the exact-match index must pick the same rule as a
+straight scan over every rule in (priority, rule_id) order.
+"""
+from budget_automation.core.rule_matcher import RuleMatcher
+
+
+def _rule(rule_id, priority, match_type, match_value, match_detail=None):
+    return {
+        'rule_id': rule_id, 'rule_pack': 'test', 'priority': priority,
+        'match_type': match_type, 'match_value': match_value,
+        'match_detail': match_detail, 'category': f'Cat {rule_id}',
+        'subcategory': 'Sub', 'is_active': True,
+    }
+
+
+RULES = [
+    _rule(1, 100, 'exact', 'AMAZON'),
+    _rule(2, 50, 'exact', 'SQ', 'BREADS BAKERY'),
+    _rule(3, 60, 'startswith', 'SQ'),
+    _rule(4, 10, 'contains', 'DAYCARE'),
+    _rule(5, 100, 'exact', 'zelle to', 'devi'),
+    _rule(6, 100, 'regex', r'^ZELLE'),
+    _rule(7, 5, 'exact', 'AMAZON', 'PRIME'),
+    _rule(8, 100, 'regex', r'('),  # invalid, never matches
+    _rule(10, 55, 'contains', 'cafe', 'main st'),
+    _rule(11, 1, 'fuzzy', 'CAFE'),  # unknown match type, never matches
+]
+
+
+def _scan(matcher, merchant_norm, merchant_detail):
+    for rule in matcher.rules:
+        if matcher.match_rule(rule, merchant_norm, merchant_detail):
+            return rule
+    return None
+
+
+def test_indexed_lookup_matches_full_scan():
+    matcher = RuleMatcher()
+    matcher.load_rules(RULES)
+
+    cases = [
+        ('AMAZON', None), ('amazon', 'Prime Video'), ('SQ', 'BREADS BAKERY'),
+        ('SQ', 'OTHER'), ('SQ', None), ('ZELLE TO', 'DEVI DAYCARE'),
+        ('ZELLE TO', 'SOMEONE'), ('KIDS DAYCARE', None), ('UNKNOWN', None),
+        ('Corner Cafe', 'Main St Location'), ('CORNER CAFE', 'main'), ('CAFE', None),
+    ]
+    for merchant_norm, merchant_detail in cases:
+        assert matcher.find_rule(merchant_norm, merchant_detail) is \
+            _scan(matcher, merchant_norm, merchant_detail), (merchant_norm, merchant_detail)
+
+
+def test_categorize_reports_rule():
+    matcher = RuleMatcher()
+    matcher.load_rules(RULES)
+
+    result = matcher.categorize('SQ', 'BREADS BAKERY')
+
+    assert result.matched_rule_id == 2
+    assert matcher.categorize('UNKNOWN').category == 'Uncategorized'
+
+
+def test_repeat_lookups_are_memoized_until_rules_reload():
+    matcher = RuleMatcher()
+    matcher.load_rules(RULES)
+    calls = []
+    scan = matcher._find_rule
+    matcher._find_rule = lambda *args: calls.append(args) or scan(*args)
+
+    for _ in range(3):
+        assert matcher.categorize('SQ', 'BREADS BAKERY').matched_rule_id == 2
+    assert len(calls) == 1
+    assert matcher.stats['matches'] == 3
+
+    matcher.load_rules([_rule(9, 1, 'exact', 'SQ')])
+    assert matcher.categorize('SQ', 'BREADS BAKERY').matched_rule_id == 9